@@ -1,37 +1,154 @@
+import hashlib
 import os
-import pandas as pd
+import threading
+import uuid
 import streamlit as st
+from datetime import date, datetime, time, timedelta
 from io import BytesIO
-from src.data_ingestion.data_cleaning import DataIngestion
-from src.data_ingestion.data_preprocessing import PlotChart
+from time import sleep
+from src.data_pipeline.job_pool import JobPool, JobQueueFull
+from src.logger import setup_logging
+from src.memo import LRUCache
+
+IMAGE_DPI = 600
+MAX_UPLOAD_BYTES = 1024 * 1024 * 1024  # total size of stored uploads before the oldest are removed
+SESSION_TTL_SECONDS = 24 * 60 * 60  # per-session working files untouched this long are removed
+POLL_SECONDS = 0.5
+
+# Streamlit re-runs this script on every interaction; only the first run configures logging
+setup_logging()
 
 # Create an artifacts folder if it doesn't exist
 os.makedirs('artifacts', exist_ok=True)
 
+@st.cache_resource
+def job_pool() -> JobPool:
+    # One bounded pool for every session, so concurrent users queue instead of oversubscribing the box
+    return JobPool()
+
+def _import_report_stack():
+    # pandas, the ingestion and matplotlib take most of a cold start; load them while the first page is shown
+    import src.data_ingestion.data_cleaning
+    from src.data_ingestion.table_renderer import preload
+    preload()
+
+@st.cache_resource
+def render_cache():
+    # Rendered PNGs and page archives on disk, shared by every session: the same view of the same dump renders once
+    from src.data_ingestion.render_cache import RenderCache
+    return RenderCache()
+
+@st.cache_resource
+def warm_up() -> threading.Thread:
+    thread = threading.Thread(target=_import_report_stack, name='warm-up', daemon=True)
+    thread.start()
+    return thread
+
+def session_cache(name: str, max_entries: int) -> LRUCache:
+    # Streamlit re-runs this script on every interaction; session_state survives the re-runs
+    if name not in st.session_state:
+        st.session_state[name] = LRUCache(max_entries)
+    return st.session_state[name]
+
+def save_upload(path: str, data) -> None:
+    # Identical uploads share one content-addressed file; write it once, atomically
+    if os.path.exists(path):
+        os.utime(path)
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    from src.data_ingestion.data_cache import evict_lru
+    # The upload just saved is about to be parsed; only older ones may go
+    evict_lru(os.path.dirname(path), MAX_UPLOAD_BYTES, suffix='.xlsx', keep=(path,))
+
+def remove_stale_sessions(current_session: str):
+    from src.data_ingestion.data_cache import evict_stale_dirs
+    evict_stale_dirs(os.path.join('artifacts', 'sessions'), SESSION_TTL_SECONDS, keep=(current_session,))
+
+def build_report(job, obj, df, operator, alarm, cluster, report_date, paginate, correlate=False,
+                 delta=False, cache=None, escalate=False) -> dict:
+    """Runs on the shared job pool: filters the parsed upload and renders the table."""
+    from src.data_ingestion.data_preprocessing import PlotChart
+
+    job.report(0.1, "Filtering alarms")
+    # The cleaned frame comes back in memory and the Excel artifact is written in the background
+    start = datetime.combine(report_date, time.min)
+    result = obj.ingest(operator, alarm, cluster, persist=True, raw_df=df,
+                        start=start, end=start + timedelta(days=1), correlate=correlate, delta=delta,
+                        escalate=escalate)
+    report = {'result': result, 'image': None, 'paginate': paginate,
+              'file_stem': f"Processed_Data_{'_'.join(operator)}_{'_'.join(alarm)}_{'_'.join(cluster)}"}
+
+    # A delta report with nothing new or cleared has no table to draw
+    if result is not None and not result.frame.empty:
+        job.report(0.3, f"Rendering {len(result.frame)} rows")
+        plot_chart = PlotChart(result.frame, cache=cache)
+        if paginate:
+            # Pages are sized to their rows and capped in memory, then zipped
+            report['image'] = plot_chart.create_paginated_images(output='zip', diff=delta).getvalue()
+        else:
+            # Generate the image using PlotChart
+            report['image'] = plot_chart.create_table_image(show_image=False, dpi=IMAGE_DPI, diff=delta).getvalue()
+    if result is not None and result.delta is not None:
+        # Only a report that was actually produced becomes the baseline of the next delta
+        result.delta.commit()
+    return report
+
+pool = job_pool()
+if 'session_id' not in st.session_state:
+    st.session_state['session_id'] = uuid.uuid4().hex
+    # A new browser session is a good moment to drop the working files of sessions long gone
+    threading.Thread(target=remove_stale_sessions, args=(st.session_state['session_id'],),
+                     name='session-cleanup', daemon=True).start()
+session_id = st.session_state['session_id']
+
+# Parsed uploads keyed by content hash, and rendered reports keyed by hash plus every render input
+upload_cache = session_cache('upload_cache', max_entries=4)
+report_cache = session_cache('report_cache', max_entries=16)
+
 # Streamlit App Title
 st.title("Data Processing and Visualization App")
 
-# Upload the file
-uploaded_file = st.file_uploader("Upload your Excel file", type=['xlsx'])
+# Upload the files; per-operator or per-circle dumps are merged into one
+uploaded_files = st.file_uploader("Upload your Excel file(s)", type=['xlsx'], accept_multiple_files=True)
+
+warm_up()
 
 # Check if a file was uploaded
-if uploaded_file is not None:
-    # Save the uploaded file in the artifacts folder
-    raw_data_path = os.path.join('artifacts', 'Raw_data.xlsx')
-    
-    with open(raw_data_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-    st.success("File uploaded and saved as raw data.")
-
-    # Load the data to preview in the app
-    df = pd.read_excel(raw_data_path, header = 1)
-    df.columns = df.columns.str.strip()
-    
-    # Validate the structure of the DataFrame (e.g., required columns)
-    required_columns = ['OpenTime', 'Cluster', 'SourceInput', 'ClearedDateTime', 'EventName']
-    if not all(col in df.columns for col in required_columns):
-        st.error("Uploaded file is missing required columns.")
+if uploaded_files:
+    # Imported only once there is data, so the first page does not wait for pandas
+    from src.data_ingestion.data_cleaning import DataIngestion, DataIngestionConfig
+    from src.data_ingestion.data_schema import SchemaValidationError
+    from src.data_ingestion.dump_merge import DumpSchemaMismatch
+
+    # Save each uploaded file under its content hash; the cleaned data goes to this session's own directory
+    file_hashes = [hashlib.sha256(uploaded.getbuffer()).hexdigest() for uploaded in uploaded_files]
+    if len(file_hashes) == 1:
+        content_hash = file_hashes[0]
+        ingestion_config = DataIngestionConfig.for_upload(content_hash, session_id)
     else:
+        content_hash = hashlib.sha256(','.join(sorted(file_hashes)).encode()).hexdigest()
+        ingestion_config = DataIngestionConfig.for_upload(file_hashes, session_id)
+
+    raw_paths = ingestion_config.raw_data_path if len(file_hashes) > 1 else [ingestion_config.raw_data_path]
+    for path, uploaded in zip(raw_paths, uploaded_files):
+        save_upload(path, uploaded.getbuffer())
+    st.success(f"{len(uploaded_files)} file(s) uploaded and saved as raw data.")
+
+    # Load the data to preview in the app through the same typed loader and cache as the ingestion
+    # A structurally wrong upload fails on its header row before the whole sheet is parsed;
+    # several uploads are parsed in parallel and merged, one row per TTNumber
+    obj = DataIngestion(ingestion_config)
+    try:
+        df = upload_cache.get_or_compute(content_hash, obj.load_raw_data)
+    except (SchemaValidationError, DumpSchemaMismatch) as e:
+        df = None
+        st.error(str(e))
+
+    if df is not None:
         st.dataframe(df.head())  # Display first few rows for verification
 
         # Provide dropdowns for filters (operators, alarms, clusters)
@@ -41,46 +158,98 @@ if uploaded_file is not None:
         cluster = st.multiselect("Select Cluster", ['Aurangabad', 'Nashik', 'Pune-1', 'Akola', 'Ahmednagar',
                                                     'Nagpur', 'Latur', 'Pune-3', 'Kolhapur', 'Pune-2', 'Goa',
                                                     'Solapur'])
+        report_date = st.date_input("Report date", value=date.today())
+        paginate = st.checkbox("Split into pages per Cluster Incharge (recommended for large tables)")
+        correlate = st.checkbox("Group cascading alarms per site into one row per incident")
+        delta = st.checkbox("Only alarms new or cleared since the last report with these filters")
+        escalate = st.checkbox("Show each alarm's age and escalation level, with escalation queues per engineer")
 
         # Validate that user has selected at least one option in each category
         if st.button("Process and Generate Image"):
             if not operator or not alarm or not cluster:
                 st.error("Please select at least one Operator, Alarm, and Cluster to process the data.")
             else:
-                with st.spinner("Processing data..."):
+                report_key = (content_hash, tuple(sorted(operator)), tuple(sorted(alarm)),
+                              tuple(sorted(cluster)), report_date, paginate, correlate, escalate,
+                              IMAGE_DPI)
+                # A delta depends on the previous report and ages on the clock, so neither is served from the cache
+                cacheable = not (delta or escalate)
+                report = report_cache.get(report_key) if cacheable else None
+                if report is not None:
+                    st.session_state['report'] = report
+                else:
+                    # Processing runs on the shared pool; this session polls it between re-runs
                     try:
-                        # Initiate data ingestion
-                        obj = DataIngestion()
-                        clean_data_path = obj.initiate_data_ingestion(operator, alarm, cluster)
-
-                        if clean_data_path and os.path.exists(clean_data_path):
-                            st.success(f"Cleaned data saved at: {clean_data_path}")
-
-                            # Load the cleaned data from the file path into a DataFrame
-                            df_clean = pd.read_excel(clean_data_path)  # Read the Excel file into a DataFrame
-                            st.dataframe(df_clean)  # Show the cleaned data for review
-
-                            # Generate the image using PlotChart
-                            plot_chart = PlotChart(df_clean)
-                            image_bytes = plot_chart.create_table_image(show_image=False)
-
-                            # Display the image in the Streamlit app
-                            st.image(image_bytes, caption='Processed Data Table')
-
-                            # Create a formatted string for the download file name
-                            operator_str = "_".join(operator)
-                            alarm_str = "_".join(alarm)
-                            cluster_str = "_".join(cluster)
-
-                            # Provide a download button for the image
-                            st.download_button(
-                                label="Download Image",
-                                data=image_bytes,
-                                file_name=f"Processed_Data_{operator_str}_{alarm_str}_{cluster_str}.png",
-                                mime="image/png"
-                            )
-                        else:
-                            st.error("Failed to generate cleaned data. File not found.")
-                    
-                    except Exception as e:
-                        st.error(f"An error occurred: {e}")
+                        job = pool.submit(f"report {session_id[:8]}", build_report, obj, df, operator, alarm,
+                                          cluster, report_date, paginate, correlate, delta, render_cache(),
+                                          escalate)
+                        st.session_state['report_job'] = (report_key if cacheable else None, job.job_id)
+                        st.session_state.pop('report', None)
+                    except JobQueueFull:
+                        st.warning("The server is busy with other reports, please try again in a moment.")
+
+        pending = st.session_state.get('report_job')
+        if pending is not None:
+            report_key, job_id = pending
+            job = pool.get(job_id)
+            if job is None:
+                st.session_state.pop('report_job')
+            elif not job.done():
+                position = pool.queue_position(job)
+                message = f"Waiting for {position} report(s) ahead" if position else job.message
+                st.progress(job.progress, text=message)
+                sleep(POLL_SECONDS)
+                st.rerun()
+            else:
+                st.session_state.pop('report_job')
+                try:
+                    report = pool.collect(job_id)
+                    if report_key is not None:
+                        report_cache.put(report_key, report)
+                    st.session_state['report'] = report
+                except Exception as e:
+                    st.error(f"An error occurred: {e}")
+
+        report = st.session_state.get('report')
+        if report is not None:
+            result = report['result']
+            if result is not None:
+                st.success(f"Cleaned data is being saved at: {result.clean_data_path}")
+
+                df_clean = result.frame
+                st.dataframe(df_clean)  # Show the cleaned data for review
+                if result.delta is not None:
+                    st.write("Changes since the last report", result.delta.counts)
+                if result.escalation is not None:
+                    st.write("Escalation queues: open alarms past their thresholds, per engineer")
+                    st.dataframe(result.escalation.queues)
+
+                if report['image'] is None:
+                    st.info("No alarms are new or cleared since the last report.")
+                elif report['paginate']:
+                    st.download_button(
+                        label="Download Pages (zip)",
+                        data=report['image'],
+                        file_name=f"{report['file_stem']}.zip",
+                        mime="application/zip"
+                    )
+                else:
+                    # Display the image in the Streamlit app
+                    st.image(report['image'], caption='Processed Data Table')
+
+                    # Provide a download button for the image
+                    st.download_button(
+                        label="Download Image",
+                        data=report['image'],
+                        file_name=f"{report['file_stem']}.png",
+                        mime="image/png"
+                    )
+            else:
+                st.error("No alarms matched the selected filters.")
+
+# Debug sidebar: how often re-runs were served from the session caches, and the shared pool's load
+with st.sidebar.expander("Debug: cache statistics"):
+    st.write("Parsed uploads", upload_cache.stats())
+    st.write("Rendered reports", report_cache.stats())
+    st.write("Render cache (disk)", render_cache().stats())
+    st.write("Job pool", pool.stats())
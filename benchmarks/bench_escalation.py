@@ -0,0 +1,31 @@
+"""Times the escalation engine over typed synthetic dumps.
+
+Run from the repository root:
+    python -m benchmarks.bench_escalation --rows 1000000 --repeat 5
+"""
+import argparse
+import time
+from datetime import datetime
+from benchmarks.synthetic_dump import make_dump_frame
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    from src.data_ingestion.alarm_escalation import EscalationEngine
+    from src.data_ingestion.data_schema import VNOC_DUMP_SCHEMA
+
+    engine = EscalationEngine()
+    now = datetime(2024, 9, 22, 23, 0)
+    print(f"{'rows':>10}{'best s':>10}{'mean s':>10}{'escalated':>11}{'queues':>8}")
+    for rows in args.rows:
+        df = VNOC_DUMP_SCHEMA.apply(make_dump_frame(rows))
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = engine.run(df, now)
+            timings.append(time.perf_counter() - start)
+        print(f"{rows:>10}{min(timings):>10.3f}{sum(timings) / len(timings):>10.3f}"
+              f"{int(result.queues['alarms'].sum()):>11}{len(result.queues):>8}")
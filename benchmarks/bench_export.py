@@ -0,0 +1,87 @@
+"""Times each cleaned-data writer and records its peak RSS.
+
+Run from the repository root:
+    python -m benchmarks.bench_export --rows 100000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+def make_clean_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Builds a frame shaped like DataIngestion's cleaned output."""
+    rng = np.random.default_rng(seed)
+    clusters = ['Aurangabad', 'Nashik', 'Pune-1', 'Akola', 'Ahmednagar', 'Nagpur',
+                'Latur', 'Pune-3', 'Kolhapur', 'Pune-2', 'Goa', 'Solapur']
+    alarms = ['Battery Discharge/Low battery', 'Mains Fail/EB Fail', 'SITE ON BATTERY',
+              'RU LOW VOLTAGE', '4G OUTAGE', '2G OUTAGE']
+    start = np.datetime64('2024-09-22T00:00')
+    return pd.DataFrame({
+        'OpenTime': start + rng.integers(0, 24 * 60, rows).astype('timedelta64[m]'),
+        'Cluster': pd.Categorical(rng.choice(clusters, rows)),
+        'SiteID': rng.integers(500000, 700000, rows),
+        'SiteName': [f'SITE {i}' for i in rng.integers(0, 5000, rows)],
+        'EventName': pd.Categorical(rng.choice(alarms, rows)),
+        'ClusterEngineer': pd.Categorical([f'Engineer {i}' for i in rng.integers(0, 60, rows)]),
+        'ClusterIncharge': pd.Categorical([f'Incharge {i}' for i in rng.integers(0, 12, rows)]),
+    })
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _run_writer(export_format: str, rows: int, queue):
+    from src.data_ingestion.data_export import get_writer
+
+    df = make_clean_frame(rows)
+    rss_before = _peak_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'clean_data' + get_writer(export_format).extension)
+        start = time.perf_counter()
+        get_writer(export_format).write(df, path)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+    queue.put({'format': export_format, 'rows': rows, 'seconds': round(elapsed, 3),
+               'peak_rss_mb': round(_peak_rss_mb(), 1),
+               'write_rss_mb': round(_peak_rss_mb() - rss_before, 1), 'bytes': size})
+
+def _run_openpyxl(rows: int, queue):
+    # The previous to_excel path, for comparison with the streaming writer
+    df = make_clean_frame(rows)
+    rss_before = _peak_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'clean_data.xlsx')
+        start = time.perf_counter()
+        df.to_excel(path, index=False, header=True, engine='openpyxl')
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+    queue.put({'format': 'xlsx (openpyxl to_excel)', 'rows': rows, 'seconds': round(elapsed, 3),
+               'peak_rss_mb': round(_peak_rss_mb(), 1),
+               'write_rss_mb': round(_peak_rss_mb() - rss_before, 1), 'bytes': size})
+
+def run(rows: int) -> list:
+    """Runs every writer in a fresh process so each peak RSS is measured in isolation."""
+    results = []
+    ctx = multiprocessing.get_context('spawn')
+    jobs = [(_run_openpyxl, (rows,))] + [(_run_writer, (fmt, rows)) for fmt in ('xlsx', 'csv', 'parquet')]
+    for target, args in jobs:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=target, args=args + (queue,))
+        proc.start()
+        results.append(queue.get())
+        proc.join()
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'writer':<26}{'seconds':>10}{'peak RSS MB':>14}{'write RSS MB':>14}{'bytes':>12}")
+    for result in run(args.rows):
+        print(f"{result['format']:<26}{result['seconds']:>10}{result['peak_rss_mb']:>14}"
+              f"{result['write_rss_mb']:>14}{result['bytes']:>12}")
@@ -0,0 +1,65 @@
+"""Measures cold import time of the entry points and which heavy dependencies they pull in.
+
+Each import runs in a fresh interpreter, so nothing is shared between samples, and is timed
+inside that interpreter, so its own start-up is not counted.
+
+Run from the repository root:
+    python -m benchmarks.bench_import --repeat 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+ENTRY_POINTS = {
+    # What app.py imports before it draws the title and the upload widget
+    'app (first page)': ['src.logger', 'src.memo', 'src.data_pipeline.job_pool'],
+    'ingestion': ['src.data_ingestion.data_cleaning'],
+    'report rendering': ['src.data_ingestion.data_preprocessing'],
+    'batch_report': ['src.data_pipeline.batch_report'],
+    'pipeline_daemon': ['src.data_pipeline.pipeline_daemon'],
+    'data_processing': ['src.data_pipeline.data_processing'],
+    'browser fetcher': ['src.data_ingestion.data_injecting'],
+    'http client': ['src.data_ingestion.vnoc_client'],
+    # Deferred to the first render
+    'matplotlib (render)': ['matplotlib.figure', 'matplotlib.backends.backend_agg'],
+}
+HEAVY_MODULES = ['pandas', 'pyarrow', 'matplotlib', 'matplotlib.pyplot', 'PIL', 'openpyxl', 'xlsxwriter',
+                 'selenium', 'requests']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(modules: list, repeat: int) -> dict:
+    samples, loaded = [], []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(modules=modules, heavy=HEAVY_MODULES)],
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result['seconds'])
+        loaded = result['loaded']
+    return {'median_seconds': round(statistics.median(samples), 3), 'min_seconds': round(min(samples), 3),
+            'heavy_modules': loaded}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=None, help='JSON file for the results')
+    args = parser.parse_args()
+
+    results = {name: measure(modules, args.repeat) for name, modules in ENTRY_POINTS.items()}
+    print(f"{'entry point':<20}{'median s':>10}{'min s':>8}  heavy modules loaded")
+    for name, result in results.items():
+        print(f"{name:<20}{result['median_seconds']:>10}{result['min_seconds']:>8}  "
+              f"{', '.join(result['heavy_modules']) or '-'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,37 @@
+"""Compares the matplotlib and Pillow table render backends.
+
+Run from the repository root:
+    python -m benchmarks.bench_render --rows 100 500 2000 --dpi 100
+"""
+import argparse
+import time
+from PIL import Image
+from benchmarks.bench_export import make_clean_frame
+from src.data_ingestion.data_preprocessing import PlotChart
+
+# Tall tables legitimately exceed Pillow's decompression-bomb threshold
+Image.MAX_IMAGE_PIXELS = None
+
+def run(row_counts, dpi: int, backends=('matplotlib', 'pillow')) -> list:
+    results = []
+    for rows in row_counts:
+        df = make_clean_frame(rows)
+        for backend in backends:
+            start = time.perf_counter()
+            buf = PlotChart(df).create_table_image(dpi=dpi, backend=backend)
+            elapsed = time.perf_counter() - start
+            results.append({'backend': backend, 'rows': rows, 'dpi': dpi, 'seconds': round(elapsed, 3),
+                            'pixels': Image.open(buf).size, 'bytes': buf.getbuffer().nbytes})
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 500, 2000])
+    parser.add_argument('--dpi', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'backend':<12}{'rows':>8}{'seconds':>10}{'pixels':>16}{'bytes':>12}")
+    for result in run(args.rows, args.dpi):
+        width, height = result['pixels']
+        print(f"{result['backend']:<12}{result['rows']:>8}{result['seconds']:>10}"
+              f"{f'{width}x{height}':>16}{result['bytes']:>12}")
@@ -0,0 +1,190 @@
+"""Times and memory-profiles each ingestion and report stage on synthetic dumps.
+
+Stages: Excel read, columnar (Parquet cache) read, datetime parse, filter, sort, export and
+PlotChart render. Each dump size runs in a fresh process; per-stage peak RSS is sampled
+from /proc while the stage runs. Results are written as JSON for comparison across versions.
+
+Run from the repository root:
+    python -m benchmarks.bench_stages --rows 1000 100000 1000000 --output bench_stages.json
+    python -m benchmarks.bench_stages --rows 1000 --compare bench_stages.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from benchmarks.synthetic_dump import dump_path
+
+PAGE_BYTES = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def _rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_BYTES / 1024 / 1024
+    except OSError:
+        # Outside Linux only the lifetime peak is available
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class StageTimer:
+    def __init__(self, rows: int, interval: float = 0.01):
+        self.rows = rows
+        self.interval = interval
+        self.results = []
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = None):
+        """Times the block and samples RSS in the background; the block may set info['rows_out']."""
+        info = {}
+        before = _rss_mb()
+        peak = [before]
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(self.interval):
+                peak[0] = max(peak[0], _rss_mb())
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            elapsed = time.perf_counter() - start
+            done.set()
+            sampler.join()
+            peak[0] = max(peak[0], _rss_mb())
+            self.results.append({'stage': name, 'dump_rows': self.rows, 'rows_in': rows_in,
+                                 'rows_out': info.get('rows_out'), 'seconds': round(elapsed, 4),
+                                 'peak_rss_mb': round(peak[0], 1), 'rss_delta_mb': round(peak[0] - before, 1)})
+
+def _run_stages(rows: int, render_rows: int, page_rows: int, queue):
+    import pandas as pd
+    from src.data_ingestion.data_cache import DataCache, DataCacheConfig
+    from src.data_ingestion.data_cleaning import DataIngestion
+    from src.data_ingestion.data_export import get_writer
+    from src.data_ingestion.data_filter import FilterEngine
+    from src.data_ingestion.data_preprocessing import PlotChart
+
+    path = dump_path(rows)
+    schema = DataIngestion.SCHEMA
+    ingestion = DataIngestion()
+    timer = StageTimer(rows)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with timer.stage('excel_read') as info:
+            wanted = set(schema.names)
+            raw = pd.read_excel(path, header=schema.header_row, usecols=lambda col: str(col).strip() in wanted)
+            info['rows_out'] = len(raw)
+
+        with timer.stage('datetime_parse', len(raw)) as info:
+            df = schema.apply(raw)
+            info['rows_out'] = len(df)
+
+        # Prime the columnar cache outside the timed block, then time a cache hit
+        cache = DataCache(DataCacheConfig(cache_dir=os.path.join(tmp_dir, 'cache')))
+        cache.load(path, lambda _: df, variant=schema.fingerprint())
+        with timer.stage('columnar_read') as info:
+            cached = cache.load(path, schema.read, variant=schema.fingerprint())
+            info['rows_out'] = len(cached)
+        del raw, cached
+
+        # The synthetic dump covers 2024-09-22 and the two days before it
+        day = datetime(2024, 9, 22)
+        stages = ingestion.filter_stages(start=day, end=datetime(2024, 9, 23))
+        with timer.stage('filter', len(df)) as info:
+            filtered = df[FilterEngine(stages).run(df).mask]
+            info['rows_out'] = len(filtered)
+
+        with timer.stage('sort', len(filtered)) as info:
+            clean = ingestion.finalise(filtered)
+            info['rows_out'] = len(clean)
+
+        for export_format in ('xlsx', 'csv', 'parquet'):
+            writer = get_writer(export_format)
+            with timer.stage(f'export_{export_format}', len(clean)) as info:
+                writer.write(clean, os.path.join(tmp_dir, 'clean_data' + writer.extension))
+                info['rows_out'] = len(clean)
+
+        # A single image of a very large table is not a meaningful report, so the render is capped
+        report = clean.head(render_rows)
+        with timer.stage('render_png', len(report)) as info:
+            PlotChart(report).create_table_image(dpi=150)
+            info['rows_out'] = len(report)
+        pages = clean.head(page_rows)
+        with timer.stage('render_pages_zip', len(pages)) as info:
+            PlotChart(pages).create_paginated_images(output='zip')
+            info['rows_out'] = len(pages)
+
+    queue.put(timer.results)
+
+def _metadata() -> dict:
+    import numpy
+    import pandas
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {'generated_at': datetime.now().isoformat(timespec='seconds'), 'commit': commit or None,
+            'python': platform.python_version(), 'pandas': pandas.__version__, 'numpy': numpy.__version__,
+            'platform': platform.platform(), 'cpu_count': os.cpu_count()}
+
+def run(rows_list: list, render_rows: int = 200, page_rows: int = 1000) -> dict:
+    """Runs every dump size in a fresh process so each peak RSS is measured in isolation."""
+    results = []
+    ctx = multiprocessing.get_context('spawn')
+    for rows in rows_list:
+        # Generated in the parent so the dump's creation is not part of any stage
+        dump_path(rows)
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_stages, args=(rows, render_rows, page_rows, queue))
+        proc.start()
+        results.extend(queue.get())
+        proc.join()
+    return {'metadata': _metadata(), 'results': results}
+
+def compare(current: dict, baseline: dict) -> list:
+    """Pairs stages by (stage, dump_rows) and returns their time and memory ratios to the baseline."""
+    previous = {(r['stage'], r['dump_rows']): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        old = previous.get((result['stage'], result['dump_rows']))
+        if old is None:
+            continue
+        rows.append({'stage': result['stage'], 'dump_rows': result['dump_rows'],
+                     'seconds_ratio': round(result['seconds'] / old['seconds'], 2) if old['seconds'] else None,
+                     'rss_delta_mb_change': round(result['rss_delta_mb'] - old['rss_delta_mb'], 1)})
+    return rows
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000])
+    parser.add_argument('--render-rows', type=int, default=200, help='rows in the single-image render stage')
+    parser.add_argument('--page-rows', type=int, default=1000, help='rows in the paginated render stage')
+    parser.add_argument('--output', default=None, help='JSON file for the results')
+    parser.add_argument('--compare', default=None, help='earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    report = run(args.rows, args.render_rows, args.page_rows)
+    print(f"{'stage':<20}{'dump rows':>11}{'rows in':>10}{'rows out':>10}{'seconds':>10}{'peak MB':>10}{'delta MB':>10}")
+    for r in report['results']:
+        print(f"{r['stage']:<20}{r['dump_rows']:>11}{str(r['rows_in'] or ''):>10}{str(r['rows_out']):>10}"
+              f"{r['seconds']:>10}{r['peak_rss_mb']:>10}{r['rss_delta_mb']:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\n{'stage':<20}{'dump rows':>11}{'time x':>10}{'delta MB +/-':>14}")
+        for r in compare(report, baseline):
+            print(f"{r['stage']:<20}{r['dump_rows']:>11}{str(r['seconds_ratio']):>10}{r['rss_delta_mb_change']:>14}")
@@ -0,0 +1,105 @@
+"""Times the HTTP export client against a local stand-in for the VNOC portal.
+
+The stand-in serves an ASP.NET-style login form and an export endpoint that only answers
+with a workbook once the session cookie is set, like the real portal.
+
+Run from the repository root:
+    python -m benchmarks.bench_vnoc_client --rows 100000 --fetches 5
+"""
+import argparse
+import io
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from benchmarks.bench_export import make_clean_frame
+
+LOGIN_PAGE = b"""<html><body><form method="post" action="Default.aspx">
+<input type="hidden" name="__VIEWSTATE" value="dDwtMTA4MTc2" />
+<input type="hidden" name="__EVENTVALIDATION" value="L2YAA0Ay" />
+<input name="appLogin$UserName" /><input name="appLogin$Password" type="password" />
+<input type="image" name="appLogin$LoginImageButton" />
+</form></body></html>"""
+
+def make_handler(workbook: bytes, username: str, password: str, stats: dict):
+    class StandInHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _logged_in(self) -> bool:
+            return 'ASPXAUTH=ok' in self.headers.get('Cookie', '')
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: dict = None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.startswith('/vnoc/Default.aspx'):
+                self._send(200, LOGIN_PAGE, 'text/html')
+            elif self.path.startswith('/vnoc/export') and self._logged_in():
+                stats['exports'] += 1
+                self._send(200, workbook, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+            else:
+                # The portal answers an expired session with its login form
+                self._send(200, LOGIN_PAGE, 'text/html')
+
+        def do_POST(self):
+            form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+            valid = (form.get('__VIEWSTATE') == ['dDwtMTA4MTc2']
+                     and form.get('appLogin$UserName') == [username]
+                     and form.get('appLogin$Password') == [password])
+            if valid:
+                stats['logins'] += 1
+                self._send(200, b'<html id="ctl00_Html1"></html>', 'text/html',
+                           {'Set-Cookie': 'ASPXAUTH=ok; Path=/vnoc/'})
+            else:
+                self._send(200, LOGIN_PAGE, 'text/html')
+
+    return StandInHandler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--fetches', type=int, default=5)
+    args = parser.parse_args()
+
+    from src.data_ingestion.vnoc_client import VnocClient, VnocClientConfig
+
+    buf = io.BytesIO()
+    make_clean_frame(args.rows).to_excel(buf, index=False)
+    stats = {'logins': 0, 'exports': 0}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(buf.getvalue(), 'bench', 'secret', stats))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = VnocClientConfig(base_url=f'http://127.0.0.1:{server.server_port}/vnoc/',
+                                  username='bench', password='secret', export_path='export',
+                                  cookie_path=os.path.join(tmp_dir, 'cookies.txt'),
+                                  raw_data_path=os.path.join(tmp_dir, 'Raw_data.xlsx'))
+        timings = []
+        for _ in range(args.fetches):
+            # A fresh client per fetch, as separate runs would be; the saved cookies skip the login
+            client = VnocClient(config)
+            start = time.perf_counter()
+            client.fetch()
+            timings.append(time.perf_counter() - start)
+            client.close()
+        size = os.path.getsize(config.raw_data_path)
+
+    server.shutdown()
+    print(f"{args.rows} rows, {size / 1024 / 1024:.1f} MB workbook, {stats['logins']} login(s) "
+          f"for {stats['exports']} exports")
+    print(f"first fetch (with login): {timings[0]:.3f}s")
+    if len(timings) > 1:
+        print(f"later fetches (reused session): {min(timings[1:]):.3f}s best, "
+              f"{sum(timings[1:]) / len(timings[1:]):.3f}s mean")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Generates synthetic VNOC TroubleTicketLogDetail dumps shaped like the real export.
+
+Every column of the export is written as text, as the portal does, below one blank row
+so the header sits where DumpSchema.header_row expects it.
+
+Run from the repository root:
+    python -m benchmarks.synthetic_dump --rows 100000 --output artifacts/Raw_data.xlsx
+"""
+import argparse
+import os
+from datetime import date, datetime, time
+import numpy as np
+import pandas as pd
+
+DUMP_COLUMNS = ['Status', 'Severity', 'VNOCTTProcessTime', 'OpenTime', 'TTNumber', 'Circle', 'Cluster', 'SiteID',
+                'SiteName', 'CustomerSiteId', 'SiteClasification', 'CreatedUser', 'SourceInput', 'EventName',
+                'ClearedDateTime', 'TTAgeing', 'Technician', 'Supervisor', 'ClusterEngineer', 'ClusterIncharge',
+                'COMH', 'EscaltionstatusLastupdateddt', 'SystemRCAService', 'EsclationStatus']
+CLUSTERS = ['Aurangabad', 'Nashik', 'Pune-1', 'Akola', 'Ahmednagar', 'Nagpur',
+            'Latur', 'Pune-3', 'Kolhapur', 'Pune-2', 'Goa', 'Solapur']
+OPERATORS = ['Airtel Dumps', 'RJIO', 'Vodafone Dumps', 'Mobile']
+ALARMS = ['DG on Load', 'Battery Discharge/Low battery', 'Mains Fail/EB Fail',
+          'SITE ON BATTERY', 'RU LOW VOLTAGE', '4G OUTAGE', '2G OUTAGE']
+DATETIME_FORMAT = '%d/%m/%Y %H:%M'
+
+def _format(values: np.ndarray) -> np.ndarray:
+    return pd.to_datetime(values).strftime(DATETIME_FORMAT).to_numpy(dtype=object)
+
+def make_dump_frame(rows: int, day: date = date(2024, 9, 22), seed: int = 0,
+                    cleared_fraction: float = 0.3, sites: int = 5000) -> pd.DataFrame:
+    """Builds a frame with every export column as text; most tickets open on day, the rest up to two days earlier."""
+    rng = np.random.default_rng(seed)
+    day_end = np.datetime64(datetime.combine(day, time.max).replace(microsecond=0), 'm')
+    open_time = day_end - rng.integers(0, 3 * 24 * 60, rows).astype('timedelta64[m]')
+    cleared = rng.random(rows) < cleared_fraction
+    cleared_time = np.minimum(open_time + rng.integers(5, 6 * 60, rows).astype('timedelta64[m]'), day_end)
+
+    site = rng.integers(0, sites, rows)
+    site_ids = (500000 + site).astype(str).astype(object)
+    # Sites keep their cluster and people, as they do in the real dumps
+    site_cluster = rng.integers(0, len(CLUSTERS), sites)
+    site_engineer = rng.integers(0, 60, sites)
+    engineer_incharge = rng.integers(0, 12, 60)
+
+    return pd.DataFrame({
+        'Status': np.where(cleared, 'Closed', 'Open').astype(object),
+        'Severity': rng.choice(['Minor', 'Major', 'Critical'], rows).astype(object),
+        'VNOCTTProcessTime': _format(open_time + np.timedelta64(17, 'm')),
+        'OpenTime': _format(open_time),
+        'TTNumber': np.char.add('TT', (526000000 + rng.permutation(rows)).astype(str)).astype(object),
+        'Circle': 'MH',
+        'Cluster': np.array(CLUSTERS, dtype=object)[site_cluster[site]],
+        'SiteID': site_ids,
+        'SiteName': np.char.add('SITE ', site.astype(str)).astype(object),
+        'CustomerSiteId': site_ids,
+        'SiteClasification': rng.choice(['Normal', 'HUB', 'Critical'], rows).astype(object),
+        'CreatedUser': 'System',
+        'SourceInput': rng.choice(OPERATORS, rows).astype(object),
+        'EventName': rng.choice(ALARMS, rows).astype(object),
+        'ClearedDateTime': np.where(cleared, _format(cleared_time), ''),
+        'TTAgeing': np.round(rng.random(rows) * 48, 2).astype(str).astype(object),
+        'Technician': np.char.add('Technician ', rng.integers(0, 400, rows).astype(str)).astype(object),
+        'Supervisor': '',
+        'ClusterEngineer': np.char.add('Engineer ', site_engineer[site].astype(str)).astype(object),
+        'ClusterIncharge': np.char.add('Incharge ', engineer_incharge[site_engineer[site]].astype(str)).astype(object),
+        'COMH': 'COMH MH',
+        'EscaltionstatusLastupdateddt': '',
+        'SystemRCAService': '',
+        'EsclationStatus': np.where(cleared, 'CLOSED', 'OPEN').astype(object),
+    }, columns=DUMP_COLUMNS)
+
+def write_dump(df: pd.DataFrame, path: str) -> str:
+    """Writes the frame as an xlsx export, with the blank first row before the header."""
+    import xlsxwriter
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    sheet = workbook.add_worksheet()
+    sheet.write_row(1, 0, df.columns)
+    for row, values in enumerate(df.itertuples(index=False, name=None), start=2):
+        sheet.write_row(row, 0, values)
+    workbook.close()
+    return path
+
+def dump_path(rows: int, seed: int = 0, directory: str = os.path.join('artifacts', 'benchmarks')) -> str:
+    """Generates the dump once per (rows, seed) and returns its path."""
+    path = os.path.join(directory, f"dump_{rows}_{seed}.xlsx")
+    if not os.path.exists(path):
+        write_dump(make_dump_frame(rows, seed=seed), f"{path}.tmp.xlsx")
+        os.replace(f"{path}.tmp.xlsx", path)
+    return path
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    if args.output:
+        print(write_dump(make_dump_frame(args.rows, seed=args.seed), args.output))
+    else:
+        print(dump_path(args.rows, args.seed))
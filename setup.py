@@ -21,5 +21,8 @@ setup(
     author='shreyash',
     author_email='shreyashchawda12@gmail.com',
     install_requires=get_requirements('requirements.txt'),
-    packages=find_packages()
+    packages=find_packages(),
+    entry_points={
+        'console_scripts': ['alarm-log-batch=src.data_pipeline.batch_cli:main'],
+    },
 )
\ No newline at end of file
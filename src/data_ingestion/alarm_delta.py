@@ -0,0 +1,110 @@
+import hashlib
+import os
+import sys
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from src.exception import CustomException
+from src.logger import logging, span
+from src.data_ingestion.data_cache import evict_lru
+
+NEW, CLEARED, STILL_OPEN = 'new', 'cleared', 'still open'
+
+@dataclass
+class DeltaConfig:
+    snapshot_dir: str = os.path.join('artifacts', 'snapshots')
+    key_columns: tuple = ('SiteID', 'EventName', 'OpenTime')  # identify an alarm across dumps
+    max_snapshot_bytes: int = 64 * 1024 * 1024  # least recently used snapshots beyond this are removed
+
+@dataclass
+class DeltaResult:
+    frame: pd.DataFrame  # changed rows with a DeltaStatus column (and unchanged ones when asked for)
+    counts: dict = field(default_factory=dict)  # rows per status, plus 'gone' for alarms no longer in the dump
+    first_run: bool = False  # no earlier snapshot, so every open alarm counts as new
+    key: str = None
+    snapshot: np.ndarray = field(default=None, repr=False)  # the open alarms' hashes, saved by commit()
+    tracker: 'DeltaTracker' = field(default=None, repr=False)
+
+    def commit(self):
+        """Makes this result the baseline of the next delta; call once its report has been produced."""
+        if self.tracker is not None:
+            self.tracker.save(self.key, self.snapshot)
+
+class DeltaTracker:
+    """Compares a filtered result set with the one last emitted for the same filters.
+
+    The snapshot is only the sorted 64-bit hashes of the open alarms' keys (8 bytes per alarm),
+    so every comparison is a vectorised set membership test.
+    """
+    STATUS_COLUMN = 'DeltaStatus'
+
+    def __init__(self, config: DeltaConfig = None):
+        self.config = config or DeltaConfig()
+
+    @staticmethod
+    def snapshot_key(*filters) -> str:
+        """Names the snapshot of one filter combination; the order of values within a filter does not matter."""
+        parts = [sorted(map(str, value)) if isinstance(value, (list, tuple, set)) else str(value) for value in filters]
+        return hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+
+    def _snapshot_path(self, key: str) -> str:
+        return os.path.join(self.config.snapshot_dir, f"{key}.npy")
+
+    def row_keys(self, df: pd.DataFrame) -> np.ndarray:
+        columns = [col for col in self.config.key_columns if col in df.columns]
+        return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+    def load(self, key: str) -> np.ndarray:
+        path = self._snapshot_path(key)
+        return np.load(path) if os.path.exists(path) else None
+
+    def save(self, key: str, hashes: np.ndarray):
+        os.makedirs(self.config.snapshot_dir, exist_ok=True)
+        path = self._snapshot_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.unique(hashes))
+        os.replace(tmp_path, path)
+        evict_lru(self.config.snapshot_dir, self.config.max_snapshot_bytes, suffix='.npy', keep=(path,))
+
+    def diff(self, df: pd.DataFrame, key: str, include_open: bool = False, save: bool = True) -> DeltaResult:
+        """Splits df (filtered rows, cleared ones included) into new, cleared and still open alarms.
+
+        New: open now but not in the snapshot. Cleared: in the snapshot and cleared in df.
+        The open alarms then become the snapshot for the next report; with save=False that is
+        left to DeltaResult.commit(), so a report that fails to render does not advance it.
+        """
+        try:
+            with span('delta', rows_in=len(df)) as record:
+                hashes = self.row_keys(df)
+                is_open = df['ClearedDateTime'].isna().to_numpy()
+                previous = self.load(key)
+                if previous is None:
+                    seen = np.zeros(len(df), dtype=bool)
+                    gone = 0
+                else:
+                    seen = np.isin(hashes, previous)
+                    gone = int(np.count_nonzero(~np.isin(previous, hashes)))
+
+                status = np.full(len(df), STILL_OPEN, dtype=object)
+                status[is_open & ~seen] = NEW
+                status[~is_open & seen] = CLEARED
+                keep = (status != STILL_OPEN) | (is_open & include_open)
+                # Cleared alarms the previous report never showed are not news either
+                keep &= is_open | seen
+
+                frame = df[keep].assign(**{self.STATUS_COLUMN: status[keep]})
+                counts = {NEW: int(np.count_nonzero(is_open & ~seen)), CLEARED: int(np.count_nonzero(~is_open & seen)),
+                          STILL_OPEN: int(np.count_nonzero(is_open & seen)), 'gone': gone}
+                result = DeltaResult(frame=frame, counts=counts, first_run=previous is None, key=key,
+                                     snapshot=hashes[is_open], tracker=self)
+                if save:
+                    result.commit()
+                record.rows_out = len(frame)
+
+            logging.info(f'Delta against snapshot {key}: {counts}')
+            return result
+
+        except Exception as e:
+            logging.error('Exception occurred while computing the report delta', exc_info=True)
+            raise CustomException(e, sys)
@@ -0,0 +1,114 @@
+import sys
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from datetime import datetime
+from src.exception import CustomException
+from src.logger import logging, span
+
+# Minutes of age at which an alarm reaches escalation level 1, 2, 3, ...
+DEFAULT_LADDERS = {
+    '4G OUTAGE': (60, 120, 240),
+    '2G OUTAGE': (60, 120, 240),
+    'SITE ON BATTERY': (60, 180, 360),
+    'Battery Discharge/Low battery': (30, 90, 180),
+    'RU LOW VOLTAGE': (60, 240, 480),
+    'Mains Fail/EB Fail': (120, 360, 720),
+    'DG on Load': (240, 480, 960),
+}
+
+@dataclass
+class EscalationConfig:
+    ladders: dict = field(default_factory=lambda: dict(DEFAULT_LADDERS))  # EventName -> ascending minutes
+    default_ladder: tuple = (120, 360, 720)  # for alarms without a ladder of their own; () never escalates
+    open_only: bool = True  # cleared alarms keep their age but are left out of the queues
+    queue_columns: tuple = ('ClusterIncharge', 'ClusterEngineer')
+
+@dataclass
+class EscalationResult:
+    frame: pd.DataFrame  # the input rows with AgeMinutes and EscalationLevel
+    queues: pd.DataFrame  # one row per queue: alarms per level, oldest age
+    queue_positions: dict  # queue key -> row positions in frame, most urgent first
+
+    def queue(self, *key) -> pd.DataFrame:
+        """Rows of one queue, most urgent first, e.g. result.queue('Incharge name', 'Engineer name')."""
+        positions = self.queue_positions.get(key)
+        if positions is None:
+            return self.frame.iloc[0:0]
+        return self.frame.iloc[positions]
+
+class EscalationEngine:
+    """Ages alarms and places them on per-EventName threshold ladders, over whole columns at once."""
+    AGE_COLUMN = 'AgeMinutes'
+    LEVEL_COLUMN = 'EscalationLevel'
+
+    def __init__(self, config: EscalationConfig = None):
+        self.config = config or EscalationConfig()
+
+    def _threshold_matrix(self, categories) -> np.ndarray:
+        # One row of thresholds per EventName category, plus a last row for missing names (code -1)
+        depth = max([len(ladder) for ladder in self.config.ladders.values()] + [len(self.config.default_ladder)])
+        matrix = np.full((len(categories) + 1, max(depth, 1)), np.inf)
+        for row, name in enumerate(list(categories) + [None]):
+            ladder = self.config.ladders.get(name, self.config.default_ladder) if name is not None else ()
+            matrix[row, :len(ladder)] = sorted(ladder)
+        return matrix
+
+    @staticmethod
+    def age_minutes(df: pd.DataFrame, now: datetime) -> np.ndarray:
+        """Minutes from OpenTime to ClearedDateTime, or to now while the alarm is open (NaN without OpenTime)."""
+        opened = df['OpenTime'].to_numpy()
+        cleared = df['ClearedDateTime'].to_numpy()
+        end = np.where(np.isnat(cleared), np.datetime64(now).astype(opened.dtype), cleared.astype(opened.dtype))
+        age = (end - opened) / np.timedelta64(1, 'm')
+        return age
+
+    def levels(self, event_names: pd.Series, age: np.ndarray) -> np.ndarray:
+        """Escalation level per row: how many of its ladder's thresholds the age has reached."""
+        if not isinstance(event_names.dtype, pd.CategoricalDtype):
+            event_names = event_names.astype('category')
+        codes = event_names.cat.codes.to_numpy()
+        matrix = self._threshold_matrix(event_names.cat.categories)
+        level = np.zeros(len(age), dtype=np.int8)
+        # One comparison per rung keeps memory at one array of rows; NaN ages compare False
+        for rung in range(matrix.shape[1]):
+            level += age >= matrix[codes, rung]
+        return level
+
+    def run(self, df: pd.DataFrame, now: datetime = None) -> EscalationResult:
+        try:
+            now = now or datetime.now()
+            with span('escalation', rows_in=len(df)) as record:
+                age = self.age_minutes(df, now)
+                level = self.levels(df['EventName'], age)
+
+                frame = df.assign(**{self.AGE_COLUMN: age, self.LEVEL_COLUMN: level})
+                candidates = level > 0
+                if self.config.open_only:
+                    candidates &= df['ClearedDateTime'].isna().to_numpy()
+                queued = frame[candidates]
+
+                # Most urgent first: highest level, then oldest; a stable sort keeps the dump order for ties
+                order = np.lexsort((-queued[self.AGE_COLUMN].to_numpy(), -queued[self.LEVEL_COLUMN].to_numpy()))
+                queued = queued.iloc[order]
+                keys = list(self.config.queue_columns)
+                grouped = queued.groupby(keys, observed=True, sort=True)
+
+                queues = pd.crosstab([queued[col] for col in keys], queued[self.LEVEL_COLUMN])
+                queues.columns = [f'level_{level}' for level in queues.columns]
+                queues['alarms'] = queues.sum(axis=1)
+                queues['oldest_minutes'] = grouped[self.AGE_COLUMN].max()
+                queues = queues.sort_values(['alarms', 'oldest_minutes'], ascending=False)
+
+                # Positions refer to frame, so queue() returns the original rows with their age and level
+                source_positions = np.flatnonzero(candidates)[order]
+                queue_positions = {key if isinstance(key, tuple) else (key,): source_positions[positions]
+                                   for key, positions in grouped.indices.items()}
+                record.rows_out = len(queued)
+
+            logging.info(f'Escalation: {len(queued)} of {len(df)} alarms escalated across {len(queues)} queues')
+            return EscalationResult(frame=frame, queues=queues, queue_positions=queue_positions)
+
+        except Exception as e:
+            logging.error('Exception occurred while computing escalations', exc_info=True)
+            raise CustomException(e, sys)
@@ -0,0 +1,102 @@
+import os
+import sys
+import pandas as pd
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from src.exception import CustomException
+from src.logger import logging
+from src.data_ingestion.data_schema import VNOC_DUMP_SCHEMA
+
+@dataclass
+class AlarmHistoryConfig:
+    history_dir: str = os.path.join('artifacts', 'history')
+    partition_file: str = 'alarms.parquet'
+
+class AlarmHistory:
+    """Alarm rows persisted as one Parquet partition per OpenTime day (history_dir/date=YYYY-MM-DD/)."""
+    PARTITION_COLUMN = 'OpenTime'
+    KEY = 'TTNumber'
+
+    def __init__(self, config: AlarmHistoryConfig = None, schema=VNOC_DUMP_SCHEMA):
+        self.config = config or AlarmHistoryConfig()
+        self.schema = schema
+
+    def partition_path(self, day: date) -> str:
+        return os.path.join(self.config.history_dir, f"date={day.isoformat()}", self.config.partition_file)
+
+    def _marker_path(self, content_hash: str) -> str:
+        return os.path.join(self.config.history_dir, '_dumps', content_hash)
+
+    def has_dump(self, content_hash: str) -> bool:
+        return os.path.exists(self._marker_path(content_hash))
+
+    def partition_days(self) -> list:
+        if not os.path.isdir(self.config.history_dir):
+            return []
+        days = []
+        for name in os.listdir(self.config.history_dir):
+            if name.startswith('date='):
+                try:
+                    days.append(date.fromisoformat(name[len('date='):]))
+                except ValueError:
+                    continue
+        return sorted(days)
+
+    def append(self, df: pd.DataFrame, content_hash: str = None) -> list:
+        """Merges a dump into the partitions of the days it covers; a re-sent ticket replaces its older row."""
+        try:
+            days = df[self.PARTITION_COLUMN].dt.normalize()
+            written = []
+            for day, part in df.groupby(days, sort=True):
+                path = self.partition_path(day.date())
+                if os.path.exists(path):
+                    part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+                if self.KEY in part.columns:
+                    part = part.drop_duplicates(subset=self.KEY, keep='last')
+                # Categories differ between dumps, so restore the schema's dtypes after the concat
+                part = self.schema.apply(part.reset_index(drop=True))
+
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                part.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path)
+                written.append(day.date())
+
+            if content_hash is not None:
+                os.makedirs(os.path.dirname(self._marker_path(content_hash)), exist_ok=True)
+                open(self._marker_path(content_hash), 'w').close()
+
+            logging.info(f'Appended {len(df)} rows to {len(written)} history partitions')
+            return written
+
+        except Exception as e:
+            logging.error('Exception occurred while appending to the alarm history', exc_info=True)
+            raise CustomException(e, sys)
+
+    def query(self, start: datetime = None, end: datetime = None) -> pd.DataFrame:
+        """Rows with start <= OpenTime < end, reading only the partitions that overlap the window."""
+        try:
+            first_day = start.date() if start is not None else date.min
+            # end is exclusive, so a window ending exactly at midnight does not need that day's partition
+            last_day = (end - timedelta(microseconds=1)).date() if end is not None else date.max
+            days = [day for day in self.partition_days() if first_day <= day <= last_day]
+            logging.info(f'Reading {len(days)} history partitions for {start} to {end}')
+
+            if not days:
+                return self.schema.apply(pd.DataFrame({name: pd.Series(dtype=object) for name in self.schema.names}))
+
+            df = pd.concat([pd.read_parquet(self.partition_path(day)) for day in days],
+                           ignore_index=True)
+            df = self.schema.apply(df)
+
+            # Only the first and last partitions can hold rows outside the window
+            in_window = pd.Series(True, index=df.index)
+            if start is not None:
+                in_window &= df[self.PARTITION_COLUMN] >= start
+            if end is not None:
+                in_window &= df[self.PARTITION_COLUMN] < end
+            return df[in_window.to_numpy()].reset_index(drop=True)
+
+        except Exception as e:
+            logging.error('Exception occurred while querying the alarm history', exc_info=True)
+            raise CustomException(e, sys)
@@ -0,0 +1,186 @@
+import os
+import sqlite3
+import sys
+import numpy as np
+import pandas as pd
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from src.exception import CustomException
+from src.logger import logging
+from src.data_ingestion.data_schema import VNOC_DUMP_SCHEMA
+
+# ISO text sorts chronologically, so SQLite can range-scan OpenTime on its index
+STORE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+@dataclass
+class AlarmStoreConfig:
+    db_path: str = os.path.join('artifacts', 'alarm_store.sqlite')
+
+@dataclass
+class SyncStats:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    opened: int = 0
+    cleared: int = 0
+    reopened: int = 0
+
+class AlarmStore:
+    KEY = 'TTNumber'
+    COLUMNS = ['TTNumber', 'OpenTime', 'Cluster', 'SiteID', 'SiteName', 'SourceInput', 'EventName',
+               'ClearedDateTime', 'ClusterEngineer', 'ClusterIncharge']
+    # NUMERIC affinity stores numeric site IDs as integers and leaves any text IDs as text
+    COLUMN_TYPES = {'SiteID': 'NUMERIC'}
+
+    def __init__(self, config: AlarmStoreConfig = None, schema=VNOC_DUMP_SCHEMA):
+        self.config = config or AlarmStoreConfig()
+        self.schema = schema
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.config.db_path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.config.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS alarms (
+                {', '.join(f'{col} {self.COLUMN_TYPES.get(col, "TEXT")}' for col in self.COLUMNS if col != self.KEY)},
+                TTNumber TEXT PRIMARY KEY,
+                row_hash INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_alarms_open
+                ON alarms (SourceInput, EventName, Cluster, OpenTime) WHERE ClearedDateTime IS NULL;
+            CREATE TABLE IF NOT EXISTS alarm_transitions (
+                TTNumber TEXT NOT NULL,
+                state TEXT NOT NULL,
+                at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_transitions_ticket ON alarm_transitions (TTNumber);
+            CREATE TABLE IF NOT EXISTS ingested_dumps (
+                content_hash TEXT PRIMARY KEY,
+                ingested_at TEXT NOT NULL,
+                rows INTEGER NOT NULL
+            );
+        """)
+        return conn
+
+    def _to_records(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Converts a typed dump frame to the text columns stored in SQLite, one row per ticket."""
+        missing = [col for col in self.COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Dump is missing columns required by the alarm store: {', '.join(missing)}")
+
+        records = pd.DataFrame(index=df.index)
+        for col in self.COLUMNS:
+            series = df[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                records[col] = series.dt.strftime(STORE_DATETIME_FORMAT)
+            else:
+                records[col] = series.astype(str).astype(object).where(series.notna(), None)
+        records = records[records[self.KEY].notna()]
+        # A ticket listed twice in one dump keeps its last row
+        return records.drop_duplicates(subset=self.KEY, keep='last').reset_index(drop=True)
+
+    def has_dump(self, content_hash: str) -> bool:
+        if not os.path.exists(self.config.db_path):
+            return False
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT 1 FROM ingested_dumps WHERE content_hash = ?', (content_hash,)).fetchone()
+        return row is not None
+
+    def sync(self, df: pd.DataFrame, content_hash: str = None) -> SyncStats:
+        """Upserts only the tickets whose contents changed and records their open/cleared transitions."""
+        try:
+            records = self._to_records(df)
+            records['row_hash'] = pd.util.hash_pandas_object(records, index=False).to_numpy().view(np.int64)
+            now = datetime.now().strftime(STORE_DATETIME_FORMAT)
+            stats = SyncStats()
+
+            with closing(self._connect()) as conn, conn:
+                stored = pd.read_sql_query('SELECT TTNumber, row_hash AS stored_hash, '
+                                           'ClearedDateTime AS stored_cleared FROM alarms', conn)
+                merged = records.merge(stored, on=self.KEY, how='left', indicator=True)
+
+                is_new = (merged['_merge'] == 'left_only').to_numpy()
+                is_changed = ~is_new & (merged['row_hash'] != merged['stored_hash']).to_numpy()
+                changed = merged[is_new | is_changed]
+                stats.inserted = int(is_new.sum())
+                stats.updated = int(is_changed.sum())
+                stats.unchanged = len(merged) - stats.inserted - stats.updated
+
+                if not changed.empty:
+                    columns = self.COLUMNS + ['row_hash']
+                    rows = changed[columns].assign(updated_at=now)
+                    assignments = ', '.join(f'{col} = excluded.{col}' for col in columns + ['updated_at']
+                                            if col != self.KEY)
+                    conn.executemany(
+                        f"INSERT INTO alarms ({', '.join(columns)}, updated_at) "
+                        f"VALUES ({', '.join('?' for _ in columns)}, ?) "
+                        f"ON CONFLICT(TTNumber) DO UPDATE SET {assignments}",
+                        rows.itertuples(index=False, name=None))
+
+                    # Transitions are derived from ClearedDateTime before and after this dump
+                    was_new = (changed['_merge'] == 'left_only').to_numpy()
+                    now_cleared = changed['ClearedDateTime'].notna().to_numpy()
+                    was_cleared = changed['stored_cleared'].notna().to_numpy()
+                    transitions = pd.concat([
+                        changed.loc[was_new, [self.KEY, 'OpenTime']].set_axis([self.KEY, 'at'], axis=1).assign(state='opened'),
+                        changed.loc[now_cleared & (was_new | ~was_cleared), [self.KEY, 'ClearedDateTime']]
+                            .set_axis([self.KEY, 'at'], axis=1).assign(state='cleared'),
+                        changed.loc[~was_new & was_cleared & ~now_cleared, [self.KEY]].assign(at=now, state='reopened'),
+                    ])
+                    conn.executemany('INSERT INTO alarm_transitions (TTNumber, state, at) VALUES (?, ?, ?)',
+                                     transitions[[self.KEY, 'state', 'at']].itertuples(index=False, name=None))
+                    counts = transitions['state'].value_counts()
+                    stats.opened = int(counts.get('opened', 0))
+                    stats.cleared = int(counts.get('cleared', 0))
+                    stats.reopened = int(counts.get('reopened', 0))
+
+                if content_hash is not None:
+                    conn.execute('INSERT OR REPLACE INTO ingested_dumps (content_hash, ingested_at, rows) VALUES (?, ?, ?)',
+                                 (content_hash, now, len(records)))
+
+            logging.info(f'Alarm store synced: {stats}')
+            return stats
+
+        except Exception as e:
+            logging.error('Exception occurred while syncing the alarm store', exc_info=True)
+            raise CustomException(e, sys)
+
+    def _from_records(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Restore the dtypes the ingestion works with
+        for spec in self.schema.columns:
+            if spec.name not in df.columns:
+                continue
+            if spec.dtype == 'datetime':
+                df[spec.name] = pd.to_datetime(df[spec.name], format=STORE_DATETIME_FORMAT)
+            elif spec.dtype is not None:
+                df[spec.name] = df[spec.name].astype(spec.dtype)
+        return df
+
+    def query_open(self, operator: list, alarm: list, cluster: list,
+                   start: datetime = None, end: datetime = None) -> pd.DataFrame:
+        """Uncleared alarms matching the filters, with start <= OpenTime < end, from the indexed store."""
+        try:
+            conditions = ['ClearedDateTime IS NULL']
+            params = []
+            for col, values in (('SourceInput', operator), ('EventName', alarm), ('Cluster', cluster)):
+                conditions.append(f"{col} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+            if start is not None:
+                conditions.append('OpenTime >= ?')
+                params.append(start.strftime(STORE_DATETIME_FORMAT))
+            if end is not None:
+                conditions.append('OpenTime < ?')
+                params.append(end.strftime(STORE_DATETIME_FORMAT))
+
+            query = (f"SELECT {', '.join(self.COLUMNS)} FROM alarms "
+                     f"WHERE {' AND '.join(conditions)} ORDER BY rowid")
+            with closing(self._connect()) as conn:
+                df = pd.read_sql_query(query, conn, params=params)
+            logging.info(f'Alarm store returned {len(df)} open alarms')
+            return self._from_records(df)
+
+        except Exception as e:
+            logging.error('Exception occurred while querying the alarm store', exc_info=True)
+            raise CustomException(e, sys)
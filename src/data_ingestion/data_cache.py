@@ -0,0 +1,126 @@
+import os
+import sys
+import hashlib
+import shutil
+import threading
+import time
+import pandas as pd
+from dataclasses import dataclass
+from src.exception import CustomException
+from src.logger import logging
+
+@dataclass
+class DataCacheConfig:
+    cache_dir: str = os.path.join('artifacts', 'cache')
+    max_cache_bytes: int = 512 * 1024 * 1024
+    chunk_size: int = 1024 * 1024
+
+def file_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Returns the sha256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def evict_lru(directory: str, max_bytes: int, suffix: str = '', keep: tuple = ()):
+    """Deletes the least recently used files in directory until it fits in max_bytes; paths in keep stay."""
+    entries = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.endswith(suffix) and os.path.isfile(path):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    # Oldest access first; hits refresh the mtime so recently used entries survive
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+            logging.info(f'Evicted cache entry {path} ({size} bytes)')
+        except OSError:
+            logging.warning(f'Could not evict cache entry {path}', exc_info=True)
+    return total
+
+def evict_stale_dirs(directory: str, max_age_seconds: float, keep: tuple = ()):
+    """Deletes the subdirectories of directory not written to within max_age_seconds, except those in keep."""
+    if not os.path.isdir(directory):
+        return
+    expired = time.time() - max_age_seconds
+    for entry in os.scandir(directory):
+        if entry.is_dir() and entry.name not in keep and entry.stat().st_mtime < expired:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            logging.info(f'Removed stale directory {entry.path}')
+
+class DataCache:
+    SUFFIX = '.parquet'
+
+    def __init__(self, config: DataCacheConfig = None):
+        self.config = config or DataCacheConfig()
+
+    def _entry_path(self, content_hash: str, variant: str = '') -> str:
+        key = content_hash if not variant else f"{content_hash}_{hashlib.sha1(variant.encode()).hexdigest()[:12]}"
+        return os.path.join(self.config.cache_dir, key + self.SUFFIX)
+
+    @staticmethod
+    def _to_parquet_safe(df: pd.DataFrame) -> pd.DataFrame:
+        # Excel columns can mix numbers and text (e.g. CustomerSiteId); Parquet needs one type per column
+        df = df.copy()
+        for col in df.columns[df.dtypes == object]:
+            not_null = df[col].notna()
+            df[col] = df[col].where(~not_null, df[col].astype(str))
+        return df
+
+    def load(self, path: str, loader, variant: str = '') -> pd.DataFrame:
+        """Loads path through loader, serving repeated loads of the same content from the columnar cache.
+
+        Errors raised by loader itself propagate unchanged so callers can handle their own validation.
+        """
+        try:
+            content_hash = file_hash(path, self.config.chunk_size)
+            entry_path = self._entry_path(content_hash, variant)
+
+            if os.path.exists(entry_path):
+                try:
+                    df = pd.read_parquet(entry_path)
+                    os.utime(entry_path)
+                    logging.info(f'Cache hit for {path} ({content_hash[:12]}), shape {df.shape}')
+                    return df
+                except Exception:
+                    # A truncated or unreadable entry is rebuilt from the source file
+                    logging.warning(f'Discarding unreadable cache entry {entry_path}', exc_info=True)
+                    os.remove(entry_path)
+
+        except Exception as e:
+            logging.error('Exception occurred while looking up the data cache', exc_info=True)
+            raise CustomException(e, sys)
+
+        logging.info(f'Cache miss for {path} ({content_hash[:12]}), parsing source file')
+        # Normalise before caching so a miss and a later hit return identical frames
+        df = self._to_parquet_safe(loader(path))
+
+        try:
+            os.makedirs(self.config.cache_dir, exist_ok=True)
+            # Unique per thread too, since app sessions can miss on the same dump at once
+            tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, entry_path)
+            evict_lru(self.config.cache_dir, self.config.max_cache_bytes, self.SUFFIX)
+        except Exception:
+            # Caching is an optimisation only; a failed write must not fail the ingestion
+            logging.warning(f'Could not write cache entry for {path}', exc_info=True)
+
+        return df
+
+    def read_excel(self, path: str, **read_kwargs) -> pd.DataFrame:
+        variant = repr(sorted(read_kwargs.items()))
+        return self.load(path, lambda p: pd.read_excel(p, **read_kwargs), variant=variant)
+
+    def clear(self):
+        if os.path.isdir(self.config.cache_dir):
+            evict_lru(self.config.cache_dir, 0, self.SUFFIX)
@@ -1,15 +1,61 @@
+import hashlib
 import os
 import pandas as pd
 import sys
-from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, time, timedelta
 from src.exception import CustomException
-from src.logger import logging
-from dataclasses import dataclass
+from src.logger import logging, span, timed
+from src.data_ingestion.data_cache import DataCache, file_hash
+from src.data_ingestion.alarm_store import AlarmStore
+from src.data_ingestion.alarm_history import AlarmHistory
+from src.data_ingestion.data_schema import VNOC_DUMP_SCHEMA
+from src.data_ingestion.data_filter import FilterEngine, FilterStage
+from src.data_ingestion.data_export import export_path, get_writer
+from src.data_ingestion.alarm_correlation import IncidentCorrelator
+from src.data_ingestion.alarm_delta import DeltaConfig, DeltaResult, DeltaTracker
+from src.data_ingestion.alarm_escalation import EscalationEngine, EscalationResult
+from src.data_ingestion.dump_merge import DumpMergeConfig, dump_paths, merge_dumps
+from dataclasses import dataclass, field
+
+# A single writer keeps artifact writes ordered and off the caller's thread
+_persist_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='clean-data-writer')
 
 @dataclass
 class DataIngestionConfig:
-    raw_data_path: str = os.path.join('artifacts', 'Raw_data.xlsx')
+    raw_data_path: str = os.path.join('artifacts', 'Raw_data.xlsx')  # a workbook, a directory of them or a list
     clean_data_path: str = os.path.join('artifacts', 'clean_data.xlsx')
+    export_format: str = 'xlsx'  # 'xlsx', 'csv' or 'parquet'; sets the clean_data_path extension
+    # Last emitted alarms per filter combination and window; not per session, which outlives no browser tab
+    snapshot_dir: str = os.path.join('artifacts', 'snapshots')
+    merge_config: DumpMergeConfig = field(default_factory=DumpMergeConfig)
+
+    @classmethod
+    def for_upload(cls, content_hash, session_id: str, artifacts_dir: str = 'artifacts', **kwargs):
+        """Paths for one user's upload: the raw dump is stored by content hash, so identical uploads
+        share one file, and the cleaned data goes to a directory of that session only.
+        A list of hashes gives a list of raw dumps, which are merged on load."""
+        raw_paths = [os.path.join(artifacts_dir, 'uploads', f"{value}.xlsx")
+                     for value in (content_hash if isinstance(content_hash, (list, tuple)) else [content_hash])]
+        return cls(raw_data_path=raw_paths if isinstance(content_hash, (list, tuple)) else raw_paths[0],
+                   clean_data_path=os.path.join(artifacts_dir, 'sessions', session_id, 'clean_data.xlsx'),
+                   snapshot_dir=os.path.join(artifacts_dir, 'snapshots'),
+                   **kwargs)
+
+@dataclass
+class IngestionResult:
+    frame: pd.DataFrame
+    stage_counts: list = field(default_factory=list)
+    clean_data_path: str = None
+    persist_future: Future = None
+    delta: DeltaResult = None
+    escalation: EscalationResult = None
+
+    def wait_persisted(self, timeout: float = None) -> str:
+        """Blocks until the background write finishes and returns the artifact path."""
+        if self.persist_future is not None:
+            self.persist_future.result(timeout)
+        return self.clean_data_path
 
 class DataIngestion:
     DEFAULT_CLUSTERS = ['Aurangabad', 'Nashik', 'Pune-1', 'Akola', 'Ahmednagar',
@@ -22,82 +68,260 @@ class DataIngestion:
                     'EscaltionstatusLastupdateddt', 'SystemRCAService', 
                     'EsclationStatus', 'ClearedDateTime', 'Circle', 
                     'SiteClasification', 'VNOCTTProcessTime', 'SourceInput']
+    SCHEMA = VNOC_DUMP_SCHEMA
 
-    def __init__(self):
-        self.ingestion_config = DataIngestionConfig()
+    def __init__(self, config: DataIngestionConfig = None):
+        self.ingestion_config = config or DataIngestionConfig()
+        self.data_cache = DataCache()
+        self.alarm_store = AlarmStore()
+        self.alarm_history = AlarmHistory()
 
-    def initiate_data_ingestion(self, operator: list = None, alarm: list = None, cluster: list = None):
-        logging.info('Data Ingestion method starts')
+    def raw_data_paths(self) -> list:
+        return dump_paths(self.ingestion_config.raw_data_path, self.ingestion_config.merge_config.pattern)
+
+    def raw_data_exists(self) -> bool:
+        paths = self.raw_data_paths()
+        return bool(paths) and all(os.path.exists(path) for path in paths)
+
+    def raw_data_hash(self) -> str:
+        """Content hash of the raw dump; for several workbooks, a hash over theirs."""
+        hashes = [file_hash(path) for path in self.raw_data_paths()]
+        return hashes[0] if len(hashes) == 1 else hashlib.sha256(','.join(sorted(hashes)).encode()).hexdigest()
 
+    def load_raw_data(self) -> pd.DataFrame:
+        """Loads the schema's columns of the raw dump with typed dtypes, reusing the columnar cache.
+
+        Several workbooks (a directory or a list in raw_data_path) are parsed in parallel and merged,
+        keeping one row per TTNumber.
+        """
+        paths = self.raw_data_paths()
+        if len(paths) != 1 or paths[0] != self.ingestion_config.raw_data_path:
+            return merge_dumps(paths, self.ingestion_config.merge_config, self.data_cache.config.cache_dir,
+                               self.SCHEMA)
+        with span('read_raw') as record:
+            df = self.data_cache.load(self.ingestion_config.raw_data_path, self.SCHEMA.read,
+                                      variant=self.SCHEMA.fingerprint())
+            record.rows_out = len(df)
+        return df
+
+    def _persist(self, df: pd.DataFrame, path: str, export_format: str):
         try:
-            # Check if raw data exists
-            if not os.path.exists(self.ingestion_config.raw_data_path):
-                raise FileNotFoundError(f"Raw data file not found at {self.ingestion_config.raw_data_path}")
-            
-            # Read raw data
-            df = pd.read_excel(self.ingestion_config.raw_data_path, header=1)
-            logging.info(f'Dataset read as pandas DataFrame with shape {df.shape}')
-
-            # Convert 'OpenTime' to datetime and filter by today's date
-            df['OpenTime'] = pd.to_datetime(df['OpenTime'], dayfirst=True)
-            df_today = df[df['OpenTime'].dt.date == datetime.today().date()]
-            logging.info(f'Filtered by today\'s date, resulting in {df_today.shape[0]} rows.')
-
-            # Early exit if DataFrame is empty
-            if df_today.empty:
-                logging.warning("No data found for today's date.")
-                return None
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write beside the target and rename so readers never see a half-written file
+            tmp_path = os.path.join(os.path.dirname(path), f".{os.getpid()}.{os.path.basename(path)}")
+            with span(f'export.{export_format}', rows_in=len(df)) as record:
+                get_writer(export_format).write(df, tmp_path)
+                record.rows_out = len(df)
+            os.replace(tmp_path, path)
+            logging.info(f'Data saved to {path}')
+        except Exception as e:
+            logging.error(f'Exception occurred while saving cleaned data to {path}', exc_info=True)
+            raise CustomException(e, sys)
 
-            # Apply cluster filter
-            cluster = cluster or self.DEFAULT_CLUSTERS
-            df_today = df_today[df_today['Cluster'].isin(cluster)]
-            logging.info(f'Filtered by clusters, resulting in {df_today.shape[0]} rows.')
+    def sync_store(self):
+        """Upserts the raw dump's changed tickets into the alarm store; skipped if this dump was already synced."""
+        if not self.raw_data_exists():
+            return None
+        content_hash = self.raw_data_hash()
+        if self.alarm_store.has_dump(content_hash):
+            logging.info('Raw data already synced into the alarm store')
+            return None
+        return self.alarm_store.sync(self.load_raw_data(), content_hash)
 
-            if df_today.empty:
-                logging.warning("No data found after filtering by clusters.")
-                return None
+    def sync_history(self):
+        """Appends the raw dump to the date-partitioned history; skipped if this dump was already appended."""
+        if not self.raw_data_exists():
+            return None
+        content_hash = self.raw_data_hash()
+        if self.alarm_history.has_dump(content_hash):
+            logging.info('Raw data already appended to the alarm history')
+            return None
+        return self.alarm_history.append(self.load_raw_data(), content_hash)
 
-            # Apply operator filter
-            operator = operator or self.DEFAULT_OPERATORS
-            df_today = df_today[df_today['SourceInput'].isin(operator)]
-            logging.info(f'Filtered by operators, resulting in {df_today.shape[0]} rows.')
+    @staticmethod
+    def _window(start: datetime = None, end: datetime = None) -> tuple:
+        # No window at all means today's alarms, as the report has always shown
+        if start is None and end is None:
+            start = datetime.combine(datetime.today().date(), time.min)
+            return start, start + timedelta(days=1)
+        return start, end
 
-            if df_today.empty:
-                logging.warning("No data found after filtering by operators.")
-                return None
+    def _query_store(self, operator: list = None, alarm: list = None, cluster: list = None,
+                     start: datetime = None, end: datetime = None):
+        # Answers the same question as the filter chain from the store's partial index on open alarms
+        self.sync_store()
+        start, end = self._window(start, end)
+        df = self.alarm_store.query_open(operator or self.DEFAULT_OPERATORS, alarm or self.DEFAULT_ALARMS,
+                                         cluster or self.DEFAULT_CLUSTERS, start, end)
+        logging.info(f'Filtered by open alarms in the store, resulting in {df.shape[0]} rows.')
+        return df
 
-            # Keep only alarms that haven't been cleared
-            df_today = df_today[df_today['ClearedDateTime'].isnull()]
-            logging.info(f'Filtered by uncleared alarms, resulting in {df_today.shape[0]} rows.')
+    def filter_stages(self, operator: list = None, alarm: list = None, cluster: list = None,
+                      start: datetime = None, end: datetime = None, include_cleared: bool = False) -> list:
+        """The ingestion's filters, in the order their row counts are reported.
 
-            if df_today.empty:
-                logging.warning("No uncleared alarms found.")
-                return None
+        OpenTime is limited to start <= OpenTime < end, or to today when neither is given.
+        include_cleared=True leaves out the uncleared-alarms filter.
+        """
+        if start is None and end is None:
+            time_stage = FilterStage.on_day("today's date", 'OpenTime', datetime.today().date(),
+                                            empty_message="No data found for today's date.")
+        else:
+            time_stage = FilterStage.between('time window', 'OpenTime', start, end,
+                                             empty_message="No data found in the selected time window.")
+        stages = [
+            time_stage,
+            FilterStage.isin('clusters', 'Cluster', cluster or self.DEFAULT_CLUSTERS),
+            FilterStage.isin('operators', 'SourceInput', operator or self.DEFAULT_OPERATORS),
+            FilterStage.isnull('uncleared alarms', 'ClearedDateTime', empty_message="No uncleared alarms found."),
+            FilterStage.isin('alarms', 'EventName', alarm or self.DEFAULT_ALARMS),
+        ]
+        return [stage for stage in stages if not (include_cleared and stage.kind == 'isnull')]
 
-            # Apply alarm filter
-            alarm = alarm or self.DEFAULT_ALARMS
-            df_today = df_today[df_today['EventName'].isin(alarm)]
-            logging.info(f'Filtered by alarms, resulting in {df_today.shape[0]} rows.')
+    @timed('sort')
+    def finalise(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Sorts filtered rows for the report and drops the columns it does not show."""
+        # Sort by 'ClusterIncharge' and 'ClusterEngineer'
+        df_sorted = df.sort_values(by=['ClusterIncharge', 'ClusterEngineer'])
+        logging.info(f'Data sorted, final shape: {df_sorted.shape}')
 
-            if df_today.empty:
-                logging.warning("No data found after filtering by alarms.")
-                return None
+        # Drop unnecessary columns
+        df_sorted = df_sorted.drop(columns=self.DROP_COLUMNS, errors='ignore').reset_index(drop=True)
+        logging.info(f'Columns dropped, final DataFrame shape: {df_sorted.shape}')
+        return df_sorted
+
+    def correlate(self, df: pd.DataFrame, stage_counts: list) -> tuple:
+        """Collapses cascading alarms per site into one row per root cause, with its ChildAlarms count."""
+        incidents = IncidentCorrelator().run(df).incidents
+        return incidents, stage_counts + [('incidents', len(incidents))]
+
+    def escalate(self, df: pd.DataFrame, stage_counts: list) -> tuple:
+        """Adds each alarm's AgeMinutes and EscalationLevel and builds the per-engineer escalation queues."""
+        escalation = EscalationEngine().run(df)
+        return escalation, stage_counts + [('escalated', sum(len(rows) for rows in escalation.queue_positions.values()))]
 
-            # Sort by 'ClusterIncharge' and 'ClusterEngineer'
-            df_sorted = df_today.sort_values(by=['ClusterIncharge', 'ClusterEngineer'])
-            logging.info(f'Data sorted, final shape: {df_sorted.shape}')
+    def delta(self, df: pd.DataFrame, snapshot_key: str, stage_counts: list) -> tuple:
+        """Keeps only the alarms that are new or cleared since the last report with the same filters.
 
-            # Drop unnecessary columns
-            df_sorted = df_sorted.drop(columns=self.DROP_COLUMNS, errors='ignore')
-            logging.info(f'Columns dropped, final DataFrame shape: {df_sorted.shape}')
+        The snapshot is not advanced here; the caller commits result.delta once the report is out.
+        """
+        tracker = DeltaTracker(DeltaConfig(snapshot_dir=self.ingestion_config.snapshot_dir))
+        delta = tracker.diff(df, snapshot_key, save=False)
+        return delta, stage_counts + [(status, count) for status, count in delta.counts.items()]
 
-            # Save the cleaned data
-            os.makedirs(os.path.dirname(self.ingestion_config.clean_data_path), exist_ok=True)
-            df_sorted.to_excel(self.ingestion_config.clean_data_path, index=False, header=True)
-            logging.info(f'Data saved to {self.ingestion_config.clean_data_path}')
+    def _result(self, df_sorted: pd.DataFrame, stage_counts: list, persist: bool, background: bool,
+                export_format: str) -> IngestionResult:
+        result = IngestionResult(frame=df_sorted, stage_counts=stage_counts)
+        if persist:
+            export_format = export_format or self.ingestion_config.export_format
+            result.clean_data_path = export_path(self.ingestion_config.clean_data_path, export_format)
+            if background:
+                result.persist_future = _persist_executor.submit(self._persist, df_sorted,
+                                                                 result.clean_data_path, export_format)
+            else:
+                self._persist(df_sorted, result.clean_data_path, export_format)
+        return result
 
-            return self.ingestion_config.clean_data_path
+    def ingest(self, operator: list = None, alarm: list = None, cluster: list = None,
+               persist: bool = False, background: bool = True, export_format: str = None,
+               source: str = 'dump', start: datetime = None, end: datetime = None, raw_df: pd.DataFrame = None,
+               correlate: bool = False, delta: bool = False, escalate: bool = False):
+        """Filters the raw dump and returns the cleaned frame in memory.
+
+        Alarms are limited to start <= OpenTime < end (today when neither is given).
+        With persist=True the frame is also written to clean_data_path in export_format
+        (default from the config), on the background writer unless background=False.
+        source='store' answers from the incremental alarm store and source='history' from the
+        date-partitioned history, instead of filtering only the current dump. raw_df, when given,
+        is used as the already loaded dump instead of reading raw_data_path. correlate=True reports
+        one row per incident (see correlate()) instead of every alarm. delta=True reports only the
+        alarms that are new or cleared since the previous delta report with the same filters,
+        marked in a DeltaStatus column; an unchanged result is returned with an empty frame, and
+        result.delta.commit() must be called once the report is produced. escalate=True adds the
+        AgeMinutes and EscalationLevel columns and puts the escalation queues on result.escalation.
+        Returns None when no rows survive the filters (except for delta reports, whose earlier
+        alarms may all have gone).
+        """
+        logging.info('Data Ingestion method starts')
+
+        try:
+            if source == 'store':
+                if delta:
+                    raise ValueError("Delta reports need the cleared alarms, use source='dump' or 'history'")
+                df = self._query_store(operator, alarm, cluster, start, end)
+                if df.empty:
+                    logging.warning("No open alarms in the store for the selected filters.")
+                    return None
+                stage_counts = [('open alarms in store', len(df))]
+                escalation = None
+                if escalate:
+                    escalation, stage_counts = self.escalate(df, stage_counts)
+                    df = escalation.frame
+                if correlate:
+                    df, stage_counts = self.correlate(df, stage_counts)
+                df_sorted = self.finalise(df)
+                result = self._result(df_sorted, stage_counts, persist, background, export_format)
+                result.escalation = escalation
+                return result
+
+            if source == 'history':
+                # Only the partitions overlapping the window are read
+                self.sync_history()
+                df = self.alarm_history.query(*self._window(start, end))
+                logging.info(f'History read as pandas DataFrame with shape {df.shape}')
+            elif source == 'dump' and raw_df is not None:
+                # The caller already holds the typed dump (e.g. the app's parsed upload)
+                df = raw_df
+            elif source == 'dump':
+                # Check if raw data exists
+                if not self.raw_data_exists():
+                    raise FileNotFoundError(f"Raw data file not found at {self.ingestion_config.raw_data_path}")
+
+                # Read only the schema's columns; OpenTime and ClearedDateTime arrive parsed as datetimes
+                df = self.load_raw_data()
+                logging.info(f'Dataset read as pandas DataFrame with shape {df.shape}')
+            else:
+                raise ValueError(f"Unknown ingestion source {source!r}, expected 'dump', 'store' or 'history'")
+
+            # Build all filters as one boolean mask instead of copying the frame after each step
+            # A delta also needs the cleared alarms, to tell which of the previous report's have cleared
+            stages = self.filter_stages(operator, alarm, cluster, start, end, include_cleared=delta)
+            filter_result = FilterEngine(stages).run(df)
+
+            # Early exit if any stage left no rows; a delta still has to compare the empty set with its snapshot
+            if filter_result.empty_stage is not None and not delta:
+                return None
+
+            df, stage_counts = df[filter_result.mask], filter_result.stage_counts
+            delta_result = None
+            if delta:
+                snapshot_key = DeltaTracker.snapshot_key(source, operator, alarm, cluster, *self._window(start, end))
+                delta_result, stage_counts = self.delta(df, snapshot_key, stage_counts)
+                df = delta_result.frame
+            escalation = None
+            if escalate:
+                escalation, stage_counts = self.escalate(df, stage_counts)
+                df = escalation.frame
+            if correlate:
+                df, stage_counts = self.correlate(df, stage_counts)
+            df_sorted = self.finalise(df)
+            result = self._result(df_sorted, stage_counts, persist, background, export_format)
+            result.delta = delta_result
+            result.escalation = escalation
+            return result
 
         except Exception as e:
             logging.error('Exception occurred during data ingestion', exc_info=True)
             raise CustomException(e, sys)
+
+    def initiate_data_ingestion(self, operator: list = None, alarm: list = None, cluster: list = None,
+                                export_format: str = None, source: str = 'dump', start: datetime = None,
+                                end: datetime = None, correlate: bool = False, delta: bool = False,
+                                escalate: bool = False):
+        """Filters the raw dump and writes it to clean_data_path, returning the path (or None)."""
+        result = self.ingest(operator, alarm, cluster, persist=True, background=False, export_format=export_format,
+                             source=source, start=start, end=end, correlate=correlate, delta=delta,
+                             escalate=escalate)
+        if result is not None and result.delta is not None:
+            result.delta.commit()
+        return result.clean_data_path if result is not None else None
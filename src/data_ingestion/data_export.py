@@ -0,0 +1,62 @@
+import os
+import pandas as pd
+from src.logger import logging
+
+class ExcelStreamWriter:
+    """Writes xlsx row by row with xlsxwriter's constant_memory mode, so memory stays flat with row count."""
+    extension = '.xlsx'
+    chunk_rows = 10000
+    datetime_format = 'yyyy-mm-dd hh:mm:ss'
+
+    def write(self, df: pd.DataFrame, path: str):
+        try:
+            import xlsxwriter
+        except ImportError:
+            logging.warning('xlsxwriter is not installed, falling back to the in-memory openpyxl writer')
+            df.to_excel(path, index=False, header=True)
+            return
+
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True,
+                                              'default_date_format': self.datetime_format})
+        try:
+            worksheet = workbook.add_worksheet()
+            worksheet.write_row(0, 0, [str(col) for col in df.columns], workbook.add_format({'bold': True}))
+
+            row_idx = 1
+            # Convert one chunk at a time to plain Python values; NaN/NaT become blank cells
+            for start in range(0, len(df), self.chunk_rows):
+                chunk = df.iloc[start:start + self.chunk_rows].astype(object)
+                chunk = chunk.where(chunk.notna(), None)
+                for row in chunk.itertuples(index=False, name=None):
+                    worksheet.write_row(row_idx, 0, row)
+                    row_idx += 1
+        finally:
+            workbook.close()
+
+class CsvWriter:
+    extension = '.csv'
+
+    def write(self, df: pd.DataFrame, path: str):
+        df.to_csv(path, index=False, header=True)
+
+class ParquetWriter:
+    extension = '.parquet'
+
+    def write(self, df: pd.DataFrame, path: str):
+        df.to_parquet(path, index=False)
+
+EXPORT_WRITERS = {
+    'xlsx': ExcelStreamWriter(),
+    'csv': CsvWriter(),
+    'parquet': ParquetWriter(),
+}
+
+def get_writer(export_format: str):
+    try:
+        return EXPORT_WRITERS[export_format]
+    except KeyError:
+        raise ValueError(f"Unsupported export format {export_format!r}, expected one of {sorted(EXPORT_WRITERS)}")
+
+def export_path(base_path: str, export_format: str) -> str:
+    """Swaps base_path's extension for the one the chosen writer produces."""
+    return os.path.splitext(base_path)[0] + get_writer(export_format).extension
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from datetime import date, datetime, time, timedelta
+from dataclasses import dataclass, field
+from src.logger import logging, span
+
+SAMPLE_ROWS = 1024
+
+@dataclass
+class FilterStage:
+    name: str  # used in the log line, e.g. 'clusters' -> "Filtered by clusters, ..."
+    column: str
+    kind: str  # 'isin', 'isnull' or 'between'
+    values: list = None
+    start: datetime = None
+    end: datetime = None
+    empty_message: str = None
+
+    @classmethod
+    def isin(cls, name: str, column: str, values, empty_message: str = None):
+        return cls(name, column, 'isin', values=list(values),
+                   empty_message=empty_message or f"No data found after filtering by {name}.")
+
+    @classmethod
+    def isnull(cls, name: str, column: str, empty_message: str = None):
+        return cls(name, column, 'isnull', empty_message=empty_message or f"No data found after filtering by {name}.")
+
+    @classmethod
+    def between(cls, name: str, column: str, start: datetime, end: datetime, empty_message: str = None):
+        """Keeps rows with start <= column < end; a None bound is left open."""
+        return cls(name, column, 'between', start=start, end=end,
+                   empty_message=empty_message or f"No data found after filtering by {name}.")
+
+    @classmethod
+    def on_day(cls, name: str, column: str, day: date, empty_message: str = None):
+        start = datetime.combine(day, time.min)
+        return cls.between(name, column, start, start + timedelta(days=1), empty_message)
+
+    def _isin_lookup(self, series: pd.Series) -> np.ndarray:
+        # One bool per category (plus a trailing False for the -1 "missing" code)
+        categories = series.cat.categories
+        lookup = np.zeros(len(categories) + 1, dtype=bool)
+        wanted = categories.get_indexer(self.values)
+        lookup[wanted[wanted >= 0]] = True
+        return lookup
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Evaluates the predicate over the whole column as a boolean array, without copying the frame."""
+        series = df[self.column]
+        if self.kind == 'isin':
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                return self._isin_lookup(series)[series.cat.codes.to_numpy()]
+            return series.isin(self.values).to_numpy()
+        if self.kind == 'isnull':
+            return series.isna().to_numpy()
+        if self.kind == 'between':
+            values = series.to_numpy()
+            mask = ~np.isnat(values)
+            if self.start is not None:
+                mask &= values >= np.datetime64(self.start).astype(values.dtype)
+            if self.end is not None:
+                mask &= values < np.datetime64(self.end).astype(values.dtype)
+            return mask
+        raise ValueError(f"Unknown filter kind {self.kind}")
+
+    def estimate_selectivity(self, df: pd.DataFrame) -> float:
+        """Estimated fraction of rows the stage keeps; lower runs first."""
+        if len(df) == 0:
+            return 0.0
+        series = df[self.column]
+        if self.kind == 'isin' and isinstance(series.dtype, pd.CategoricalDtype):
+            # Exact from category frequencies: a bincount over the integer codes
+            counts = np.bincount(series.cat.codes.to_numpy() + 1, minlength=len(series.cat.categories) + 1)
+            lookup = self._isin_lookup(series)
+            return float(counts[1:][lookup[:-1]].sum()) / len(df)
+        step = max(len(df) // SAMPLE_ROWS, 1)
+        return float(self.mask(df.iloc[::step]).mean())
+
+@dataclass
+class FilterResult:
+    mask: np.ndarray
+    stage_counts: list = field(default_factory=list)  # (stage name, rows left) in declared order
+    empty_stage: FilterStage = None
+
+    @property
+    def rows(self) -> int:
+        return int(self.mask.sum())
+
+class FilterEngine:
+    def __init__(self, stages: list):
+        self.stages = stages
+
+    def run(self, df: pd.DataFrame) -> FilterResult:
+        # Evaluate the most selective predicates first so an empty result stops evaluation early
+        order = sorted(self.stages, key=lambda stage: stage.estimate_selectivity(df))
+        masks = {}
+        combined = np.ones(len(df), dtype=bool)
+        rows_left = len(df)
+        for stage in order:
+            with span(f'filter.{stage.name}', rows_in=rows_left) as record:
+                masks[stage.name] = stage.mask(df)
+                combined &= masks[stage.name]
+                record.rows_out = int(combined.sum())
+            rows_left = record.rows_out
+            if not rows_left:
+                break
+
+        # Report the cumulative row counts in the declared order, as the chained filters did
+        result = FilterResult(mask=combined)
+        running = np.ones(len(df), dtype=bool)
+        for stage in self.stages:
+            stage_mask = masks.get(stage.name)
+            if stage_mask is None:
+                stage_mask = stage.mask(df)
+            running &= stage_mask
+            rows = int(running.sum())
+            result.stage_counts.append((stage.name, rows))
+            logging.info(f'Filtered by {stage.name}, resulting in {rows} rows.')
+
+            if rows == 0:
+                logging.warning(stage.empty_message)
+                result.empty_stage = stage
+                break
+
+        return result
@@ -1,25 +1,38 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
-import logging
+import glob
 import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from src.exception import CustomException
+from src.logger import logging, setup_logging
+from src.data_ingestion.vnoc_client import VnocClientConfig, VnocLoginError
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+@dataclass
+class BrowserPoolConfig:
+    size: int = 2
+    headless: bool = True
+    max_uses: int = 20  # exports per driver before it is recycled
+    max_age_seconds: float = 30 * 60
+    page_load_timeout: float = 60
+    download_root: str = None  # per-driver download directories are created here (a temp dir by default)
 
-# Optional: run in headless mode if not debugging
-chrome_options = Options()
-# chrome_options.add_argument("--headless")  # Uncomment for headless mode
-
-# Path to your chromedriver executable using webdriver_manager
-from webdriver_manager.chrome import ChromeDriverManager
-service = Service(ChromeDriverManager().install())
-
-driver = webdriver.Chrome(service=service, options=chrome_options)
+@dataclass
+class BrowserFetcherConfig:
+    login_path: str = 'Default.aspx'
+    grid_path: str = 'aspx/TroubleTicketLogDetail.aspx'
+    grid_menu_selector: str = "div[role='button'][id*='grid-menu']"
+    export_menu_text: str = field(default_factory=lambda: os.environ.get('VNOC_EXPORT_MENU_TEXT',
+                                                                         'Export all data as excel'))
+    # CSS selector of the grid's SourceInput filter box, needed only for per-operator exports
+    operator_filter_selector: str = field(default_factory=lambda: os.environ.get('VNOC_OPERATOR_FILTER_SELECTOR'))
+    loading_timeout: float = 60
+    download_timeout: float = 300
+    client: VnocClientConfig = field(default_factory=VnocClientConfig)
 
 def log_element_info(element, description):
     """Logs basic information about the element."""
@@ -32,91 +45,281 @@ def log_element_info(element, description):
     except Exception as e:
         logging.error(f"Error logging element info: {e}")
 
-try:
-    logging.info("Opening login page.")
-    driver.get("https://vnoc.atctower.in/vnoc/Default.aspx")
+class PooledDriver:
+    def __init__(self, driver, download_dir: str):
+        self.driver = driver
+        self.download_dir = download_dir
+        self.created_at = time.monotonic()
+        self.uses = 0
+        self.logged_in = False
 
-    logging.info("Filling in login form.")
-    WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.NAME, 'appLogin$UserName'))
-    ).send_keys('MH_jitendra_Sahoo')
-    driver.find_element(By.NAME, 'appLogin$Password').send_keys('Welcome@Atc')
+    def healthy(self) -> bool:
+        try:
+            return self.driver.execute_script('return 1') == 1
+        except Exception:
+            return False
 
-    logging.info("Submitting login form.")
-    driver.find_element(By.NAME, 'appLogin$LoginImageButton').click()
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            logging.warning('Error while closing a browser', exc_info=True)
+        shutil.rmtree(self.download_dir, ignore_errors=True)
 
-    logging.info("Waiting for post-login page.")
-    WebDriverWait(driver, 15).until(
-        EC.presence_of_element_located((By.ID, 'ctl00_Html1'))
-    )
+class BrowserPool:
+    """Headless Chrome drivers started on first use and kept, with their logged-in sessions, between fetches."""
 
-    logging.info("Navigating to secured page.")
-    driver.get('https://vnoc.atctower.in/vnoc/aspx/TroubleTicketLogDetail.aspx')
+    def __init__(self, config: BrowserPoolConfig = None):
+        self.config = config or BrowserPoolConfig()
+        self._idle = []  # most recently returned last, so warm sessions are reused first
+        self._created = 0
+        # Guards _idle and _created; waiters are woken when a driver comes back or a slot frees up
+        self._available = threading.Condition()
+        self._service = None
 
-    logging.info("Waiting for target page to fully load.")
-    WebDriverWait(driver, 20).until(
-        EC.presence_of_element_located((By.ID, 'aspnetForm'))
-    )
+    def _new_driver(self) -> PooledDriver:
+        # Selenium is imported here so importing this module starts nothing and needs no network
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
 
-    # Wait for the "Loading..." overlay to disappear
-    logging.info("Waiting for 'Loading...' overlay to disappear.")
-    WebDriverWait(driver, 60).until(
-        EC.invisibility_of_element_located((By.XPATH, "//*[contains(text(),'Loading....')]"))
-    )
+        if self._service is None:
+            try:
+                from webdriver_manager.chrome import ChromeDriverManager
+                self._service = Service(ChromeDriverManager().install())
+            except ImportError:
+                # Selenium 4.6+ locates a matching chromedriver itself
+                self._service = Service()
 
-    logging.info("Locating the grid menu button.")
-    try:
-        grid_menu_button = WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='button'][id*='grid-menu']"))
+        download_dir = tempfile.mkdtemp(prefix='vnoc-download-', dir=self.config.download_root)
+        options = Options()
+        if self.config.headless:
+            options.add_argument('--headless=new')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_experimental_option('prefs', {'download.default_directory': download_dir,
+                                                  'download.prompt_for_download': False})
+        driver = webdriver.Chrome(service=self._service, options=options)
+        driver.set_page_load_timeout(self.config.page_load_timeout)
+        logging.info('Started a headless browser')
+        return PooledDriver(driver, download_dir)
+
+    def _expired(self, pooled: PooledDriver) -> bool:
+        return (pooled.uses >= self.config.max_uses
+                or time.monotonic() - pooled.created_at > self.config.max_age_seconds)
+
+    def _checkout(self) -> PooledDriver:
+        while True:
+            with self._available:
+                # Every driver is busy and the pool is full; wait for one to come back or be discarded
+                while not self._idle and self._created >= self.config.size:
+                    self._available.wait()
+                if self._idle:
+                    pooled = self._idle.pop()
+                else:
+                    self._created += 1
+                    pooled = None
+
+            if pooled is None:
+                try:
+                    return self._new_driver()
+                except Exception:
+                    self._release_slot()
+                    raise
+            if self._expired(pooled) or not pooled.healthy():
+                logging.info('Recycling a browser')
+                self._discard(pooled)
+                continue
+            return pooled
+
+    def _release_slot(self):
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    def _discard(self, pooled: PooledDriver):
+        pooled.quit()
+        self._release_slot()
+
+    def _checkin(self, pooled: PooledDriver):
+        with self._available:
+            self._idle.append(pooled)
+            self._available.notify()
+
+    @contextmanager
+    def acquire(self):
+        """Lends a driver; one that raised is discarded rather than returned to the pool."""
+        pooled = self._checkout()
+        try:
+            yield pooled
+        except Exception:
+            self._discard(pooled)
+            raise
+        else:
+            pooled.uses += 1
+            self._checkin(pooled)
+
+    def close(self):
+        with self._available:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._discard(pooled)
+
+class VnocBrowserFetcher:
+    """Downloads the trouble ticket export by driving the portal's grid, for when the HTTP client cannot."""
+
+    def __init__(self, config: BrowserFetcherConfig = None, pool: BrowserPool = None):
+        self.config = config or BrowserFetcherConfig()
+        self.pool = pool or BrowserPool()
+
+    def _url(self, path: str) -> str:
+        return self.config.client.base_url.rstrip('/') + '/' + path
+
+    def login(self, pooled: PooledDriver):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        client = self.config.client
+        if not client.username or not client.password:
+            raise VnocLoginError("VNOC credentials are not configured; set VNOC_USERNAME and VNOC_PASSWORD")
+
+        driver = pooled.driver
+        logging.info("Opening login page.")
+        driver.get(self._url(self.config.login_path))
+
+        logging.info("Filling in login form.")
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.NAME, 'appLogin$UserName'))
+        ).send_keys(client.username)
+        driver.find_element(By.NAME, 'appLogin$Password').send_keys(client.password)
+
+        logging.info("Submitting login form.")
+        driver.find_element(By.NAME, 'appLogin$LoginImageButton').click()
+
+        logging.info("Waiting for post-login page.")
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.ID, 'ctl00_Html1'))
         )
+        pooled.logged_in = True
 
-        # Log information about the element
-        log_element_info(grid_menu_button, "Grid menu button")
+    def open_grid(self, pooled: PooledDriver):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        if not pooled.logged_in:
+            self.login(pooled)
+
+        driver = pooled.driver
+        logging.info("Navigating to secured page.")
+        driver.get(self._url(self.config.grid_path))
+        if driver.find_elements(By.NAME, 'appLogin$UserName'):
+            # The pooled session expired on the portal side
+            self.login(pooled)
+            driver.get(self._url(self.config.grid_path))
 
-        # Ensure the element is clickable
+        logging.info("Waiting for target page to fully load.")
         WebDriverWait(driver, 20).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "div[role='button'][id*='grid-menu']"))
+            EC.presence_of_element_located((By.ID, 'aspnetForm'))
         )
 
-        # Using ActionChains to ensure the element is in view and can be interacted with
-        logging.info("Attempting to hover and click the grid menu button.")
-        actions = ActionChains(driver)
-        actions.move_to_element(grid_menu_button).perform()  # Move to the element first
-        actions.click(grid_menu_button).perform()  # Then click
+        # Wait for the "Loading..." overlay to disappear
+        logging.info("Waiting for 'Loading...' overlay to disappear.")
+        WebDriverWait(driver, self.config.loading_timeout).until(
+            EC.invisibility_of_element_located((By.XPATH, "//*[contains(text(),'Loading....')]"))
+        )
 
-        # If regular click fails, try clicking via JavaScript
-        if not grid_menu_button.is_displayed():
-            logging.info("Attempting to click via JavaScript as a fallback.")
-            driver.execute_script("arguments[0].click();", grid_menu_button)
+    def _apply_operator(self, pooled: PooledDriver, operator: str):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        if not self.config.operator_filter_selector:
+            raise ValueError("Per-operator exports need VNOC_OPERATOR_FILTER_SELECTOR")
+        box = WebDriverWait(pooled.driver, 20).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, self.config.operator_filter_selector))
+        )
+        box.clear()
+        box.send_keys(operator)
+        WebDriverWait(pooled.driver, self.config.loading_timeout).until(
+            EC.invisibility_of_element_located((By.XPATH, "//*[contains(text(),'Loading....')]"))
+        )
+
+    def _click_export(self, pooled: PooledDriver):
+        from selenium.webdriver.common.action_chains import ActionChains
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        driver = pooled.driver
+        logging.info("Locating the grid menu button.")
+        grid_menu_button = WebDriverWait(driver, 30).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, self.config.grid_menu_selector))
+        )
+        log_element_info(grid_menu_button, "Grid menu button")
+
+        # Move to the element first so it is in view, then click
+        ActionChains(driver).move_to_element(grid_menu_button).click(grid_menu_button).perform()
 
         logging.info("Waiting for the grid menu to be visible.")
-        grid_menu = WebDriverWait(driver, 20).until(
+        WebDriverWait(driver, 20).until(
             EC.visibility_of_element_located((By.CSS_SELECTOR, ".ui-grid-menu"))
         )
+        for feature in driver.find_elements(By.CSS_SELECTOR, ".ui-grid-menu .menu-item"):
+            if feature.text.strip().lower() == self.config.export_menu_text.lower():
+                feature.click()
+                return
+        raise ValueError(f"Grid menu has no {self.config.export_menu_text!r} item")
 
-        logging.info("Grid menu is visible.")
+    def _wait_for_download(self, pooled: PooledDriver, before: set) -> str:
+        deadline = time.monotonic() + self.config.download_timeout
+        while time.monotonic() < deadline:
+            done = [path for path in glob.glob(os.path.join(pooled.download_dir, '*'))
+                    if path not in before and not path.endswith('.crdownload')]
+            if done:
+                return done[0]
+            time.sleep(0.5)
+        raise TimeoutError(f"Export did not finish downloading within {self.config.download_timeout}s")
 
-        # Collect all features present in the grid menu
-        logging.info("Collecting features from the grid menu.")
-        features = driver.find_elements(By.CSS_SELECTOR, ".ui-grid-menu .menu-item")
-        for feature in features:
-            feature_name = feature.text
-            logging.info(f"Feature found: {feature_name}")
+    def fetch(self, target: str = None, operator: str = None) -> str:
+        """Exports the grid (limited to one operator if given) to target and returns the path."""
+        target = target or self.config.client.raw_data_path
+        try:
+            with self.pool.acquire() as pooled:
+                self.open_grid(pooled)
+                if operator is not None:
+                    self._apply_operator(pooled, operator)
 
-    except Exception as e:
-        logging.error(f"Error interacting with grid menu button: {e}")
-        driver.save_screenshot('grid_menu_error_screenshot.png')  # Save screenshot on error
-        logging.info("Screenshot saved as 'grid_menu_error_screenshot.png'.")
-
-except Exception as e:
-    logging.error(f"An error occurred: {e}")
-    logging.info("Current URL: %s", driver.current_url)
-    logging.info("Page Source Length: %d", len(driver.page_source))
-
-    # Take a screenshot to debug the issue
-    driver.save_screenshot('error_screenshot.png')
-    logging.info("Screenshot saved as 'error_screenshot.png'.")
-
-finally:
-    logging.info("Closing browser.")
-    driver.quit()
+                before = set(glob.glob(os.path.join(pooled.download_dir, '*')))
+                self._click_export(pooled)
+                downloaded = self._wait_for_download(pooled, before)
+
+                os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+                shutil.move(downloaded, target)
+            logging.info(f'Browser export saved to {target}')
+            return target
+
+        except Exception as e:
+            logging.error('Exception occurred while exporting through the browser', exc_info=True)
+            raise CustomException(e, sys)
+
+    def fetch_operators(self, operators: list, target_dir: str = 'artifacts') -> dict:
+        """Exports each operator's tickets in parallel, one pooled browser per export."""
+        targets = {operator: os.path.join(target_dir, f"Raw_data_{operator.replace(' ', '_')}.xlsx")
+                   for operator in operators}
+        with ThreadPoolExecutor(max_workers=self.pool.config.size) as executor:
+            futures = {operator: executor.submit(self.fetch, target, operator)
+                       for operator, target in targets.items()}
+            return {operator: future.result() for operator, future in futures.items()}
+
+    def close(self):
+        self.pool.close()
+
+if __name__ == '__main__':
+    setup_logging()
+    fetcher = VnocBrowserFetcher()
+    try:
+        print(fetcher.fetch())
+    finally:
+        fetcher.close()
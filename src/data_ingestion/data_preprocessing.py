@@ -1,68 +1,128 @@
-import pandas as pd
 import io
-import matplotlib.pyplot as plt
+import pandas as pd
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from src.exception import CustomException
-from src.logger import logging
+from src.logger import log_frame, logging, span
+from src.data_ingestion.table_renderer import TableStyle, cell_text, column_widths, get_renderer
+from src.data_ingestion.table_pages import PaginationConfig, TablePaginator
+from src.data_ingestion.render_cache import RenderCache
 
 @dataclass
 class PlotChartConfig:
     image_filename: str = "Alarm.png"
+    status_column: str = 'DeltaStatus'  # set by delta reports; rows are highlighted by its value
+    status_colors: dict = field(default_factory=lambda: {'new': '#ffc7ce', 'cleared': '#c6efce'})
 
 class PlotChart:
-    def __init__(self, df: pd.DataFrame, config: PlotChartConfig = PlotChartConfig()):
+    def __init__(self, df: pd.DataFrame, config: PlotChartConfig = PlotChartConfig(), cache: RenderCache = None):
         self.df = df
         self.config = config
+        self.cache = cache  # identical frames rendered with identical parameters are served from here
         logging.info(f"Image will be saved as {self.config.image_filename}")
 
-    def create_table_image(self, width_factors=None, show_image=False, dpi=600):
+    def _frame_and_colors(self, diff: bool) -> tuple:
+        # Rows are highlighted by their delta status; diff=True also leaves out the unchanged ones
+        status_column = self.config.status_column
+        if status_column not in self.df.columns:
+            if diff:
+                raise ValueError(f"Diff rendering needs a {status_column} column, as produced by ingest(delta=True)")
+            return self.df, None
+        status = self.df[status_column].astype(object)
+        df = self.df
+        if diff:
+            changed = status.isin(list(self.config.status_colors)).to_numpy()
+            df, status = df[changed], status[changed]
+        colors = status.map(self.config.status_colors).astype(object)
+        return df, colors.where(colors.notna(), None).to_numpy()
+
+    def _cache_key(self, df: pd.DataFrame, **params) -> str:
+        if self.cache is None:
+            return None
+        return self.cache.key(df, status_colors=self.config.status_colors, **params)
+
+    def _cached(self, key: str, render) -> io.BytesIO:
+        # render() returns a BytesIO; with a key its bytes come from, or go into, the render cache
+        if key is None:
+            return render()
+        return io.BytesIO(self.cache.get_or_render(key, lambda: render().getvalue()))
+
+    def create_table_image(self, width_factors=None, show_image=False, dpi=600, backend='matplotlib',
+                           style: TableStyle = TableStyle(), diff: bool = False):
+        """Renders the table as one PNG; diff=True draws only the new and cleared rows of a delta report."""
         try:
-            logging.info(f"DataFrame shape before creating image: {self.df.shape}")
-            logging.info(f"DataFrame content:\n{self.df.head()}")
+            df, row_colors = self._frame_and_colors(diff)
+            logging.info(f"DataFrame shape before creating image: {df.shape}")
+            log_frame("DataFrame content:", df)
 
-            if self.df.empty:
+            if df.empty:
                 raise CustomException("DataFrame is empty. Cannot create table image.", sys)
 
-            # Create a figure and axis for the plot
-            fig, ax = plt.subplots(figsize=(25, 15))
-            ax.xaxis.set_visible(False)
-            ax.yaxis.set_visible(False)
-            ax.set_frame_on(False)
+            def render():
+                # Convert cells to strings once and size every column from that single array
+                text = cell_text(df)
+                widths = column_widths(text, df.columns, width_factors, style)
 
-            # Render the DataFrame as a table
-            tbl = ax.table(cellText=self.df.values, colLabels=self.df.columns, cellLoc='center', loc='center')
+                with span(f'render.{backend}', rows_in=len(df), dpi=dpi) as record:
+                    buf = get_renderer(backend).render(text, df.columns, widths, dpi, style, row_colors=row_colors)
+                    record.rows_out = len(df)
+                logging.info(f"Image created in memory with the {backend} backend.")
+                return buf
 
-            # Style the header row
-            tbl.auto_set_font_size(False)
-            tbl.set_fontsize(10)
-            tbl.scale(1, 2)
+            key = self._cache_key(df, output='png', width_factors=width_factors or {}, dpi=dpi, backend=backend,
+                                  style=style)
+            return self._cached(key, render)
 
-            for key, cell in tbl.get_celld().items():
-                if key[0] == 0:  # Header row
-                    cell.set_text_props(weight='bold', color='black')
-                    cell.set_facecolor('yellow')
+        except Exception as e:
+            logging.error(f"An error occurred while creating the table image: {str(e)}", exc_info=True)
+            raise CustomException(e, sys)  # Ensure sys is passed to capture traceback context
+
+    def create_paginated_images(self, output='zip', target=None, width_factors=None, backend='matplotlib',
+                                style: TableStyle = TableStyle(), config: PaginationConfig = PaginationConfig(),
+                                diff: bool = False):
+        """Renders the table as pages of rows, each sized to its content and capped in memory.
 
-            # Dynamically adjust column width
-            if width_factors is None:
-                width_factors = {col: 1.5 for col in self.df.columns}
+        output='png' writes one file per page into the target directory and returns their paths;
+        'zip' and 'pdf' write to target (a path or file object), or return a BytesIO when it is None.
+        diff=True draws only the new and cleared rows of a delta report.
+        """
+        try:
+            df, row_colors = self._frame_and_colors(diff)
+            if df.empty:
+                raise CustomException("DataFrame is empty. Cannot create table image.", sys)
 
-            for col in self.df.columns:
-                col_idx = self.df.columns.get_loc(col)
-                max_width = max([len(str(item)) for item in self.df[col]]) * width_factors.get(col, 1.5) * 0.004
-                for key, cell in tbl.get_celld().items():
-                    if key[1] == col_idx:
-                        cell.set_width(max_width)
+            def render():
+                paginator = TablePaginator(df, width_factors, style, config, row_colors)
+                if output == 'png':
+                    if target is None:
+                        raise ValueError("A target directory is required for output='png'")
+                    with span('render.pages.png', rows_in=len(df), backend=backend) as record:
+                        paths = paginator.write_pngs(target, backend)
+                        record.rows_out = len(df)
+                    return paths
 
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', bbox_inches='tight', dpi=dpi)
-            buf.seek(0)
+                buf = io.BytesIO() if target is None else target
+                with span(f'render.pages.{output}', rows_in=len(df), backend=backend) as record:
+                    if output == 'zip':
+                        paginator.write_zip(buf, backend)
+                    elif output == 'pdf':
+                        paginator.write_pdf(buf)
+                    else:
+                        raise ValueError(f"Unsupported paginated output {output!r}, expected 'png', 'zip' or 'pdf'")
+                    record.rows_out = len(df)
 
-            logging.info("Image created in memory.")
-            plt.close(fig)
+                if target is None:
+                    buf.seek(0)
+                logging.info(f"Paginated {output} output created.")
+                return buf
 
-            return buf
+            # Only in-memory archives are cached; files written to a target are the caller's
+            if target is not None or output not in ('zip', 'pdf'):
+                return render()
+            key = self._cache_key(df, output=output, width_factors=width_factors or {}, backend=backend,
+                                  style=style, pagination=config)
+            return self._cached(key, render)
 
         except Exception as e:
-            logging.error(f"An error occurred while creating the table image: {str(e)}", exc_info=True)
-            raise CustomException(e, sys)  # Ensure sys is passed to capture traceback context
+            logging.error(f"An error occurred while creating paginated table images: {str(e)}", exc_info=True)
+            raise CustomException(e, sys)
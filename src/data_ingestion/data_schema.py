@@ -0,0 +1,97 @@
+import os
+import pandas as pd
+from dataclasses import dataclass
+from src.logger import logging
+
+class SchemaValidationError(ValueError):
+    def __init__(self, missing_columns, source: str = None):
+        self.missing_columns = list(missing_columns)
+        self.source = source
+        name = f"Uploaded file {os.path.basename(source)}" if source else "Uploaded file"
+        super().__init__(f"{name} is missing required columns: {', '.join(self.missing_columns)}")
+
+    def __reduce__(self):
+        # Keeps the arguments intact when the error crosses a process pool
+        return type(self), (self.missing_columns, self.source)
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    name: str
+    dtype: str = None  # None keeps the parsed type; 'datetime', 'category' or any pandas dtype name
+    required: bool = True
+
+@dataclass(frozen=True)
+class DumpSchema:
+    columns: tuple
+    header_row: int = 1
+    datetime_format: str = '%d/%m/%Y %H:%M'
+
+    @property
+    def names(self) -> list:
+        return [spec.name for spec in self.columns]
+
+    @property
+    def required_names(self) -> list:
+        return [spec.name for spec in self.columns if spec.required]
+
+    def fingerprint(self) -> str:
+        """Identifies the schema so cached frames are rebuilt when it changes."""
+        return repr(self)
+
+    def validate_columns(self, columns):
+        present = {str(col).strip() for col in columns}
+        missing = [name for name in self.required_names if name not in present]
+        if missing:
+            raise SchemaValidationError(missing)
+
+    def validate_header(self, path: str):
+        """Checks the header row only, so a wrong upload fails before the full sheet is parsed."""
+        header = pd.read_excel(path, header=self.header_row, nrows=0)
+        self.validate_columns(header.columns)
+
+    def _parse_datetime(self, series: pd.Series) -> pd.Series:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        try:
+            return pd.to_datetime(series, format=self.datetime_format)
+        except (ValueError, TypeError):
+            # Cells Excel stored as real dates mixed with text; fall back to the slower inference
+            logging.warning(f"Column {series.name} does not match {self.datetime_format}, inferring day-first dates")
+            return pd.to_datetime(series, dayfirst=True)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Validates an already loaded frame and converts it to the schema's dtypes."""
+        df.columns = df.columns.map(lambda col: str(col).strip())
+        self.validate_columns(df.columns)
+
+        for spec in self.columns:
+            if spec.name not in df.columns:
+                continue
+            if spec.dtype == 'datetime':
+                df[spec.name] = self._parse_datetime(df[spec.name])
+            elif spec.dtype is not None:
+                df[spec.name] = df[spec.name].astype(spec.dtype)
+
+        return df[[name for name in self.names if name in df.columns]]
+
+    def read(self, path: str) -> pd.DataFrame:
+        """Reads only the schema's columns from a dump and returns them with their declared dtypes."""
+        self.validate_header(path)
+        wanted = set(self.names)
+        df = pd.read_excel(path, header=self.header_row, usecols=lambda col: str(col).strip() in wanted)
+        logging.info(f'Read {df.shape[1]} of the dump\'s columns, {df.shape[0]} rows')
+        return self.apply(df)
+
+# Columns of the VNOC TroubleTicketLogDetail export that the ingestion and reports use
+VNOC_DUMP_SCHEMA = DumpSchema(columns=(
+    ColumnSpec('OpenTime', 'datetime'),
+    ColumnSpec('TTNumber', required=False),
+    ColumnSpec('Cluster', 'category'),
+    ColumnSpec('SiteID', required=False),
+    ColumnSpec('SiteName', required=False),
+    ColumnSpec('SourceInput', 'category'),
+    ColumnSpec('EventName', 'category'),
+    ColumnSpec('ClearedDateTime', 'datetime'),
+    ColumnSpec('ClusterEngineer', 'category'),
+    ColumnSpec('ClusterIncharge', 'category'),
+))
@@ -0,0 +1,116 @@
+import glob
+import os
+import sys
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from pandas.api.types import union_categoricals
+from src.exception import CustomException
+from src.logger import logging, span
+from src.processes import process_pool
+from src.data_ingestion.data_cache import DataCache, DataCacheConfig
+from src.data_ingestion.data_schema import VNOC_DUMP_SCHEMA, SchemaValidationError
+
+@dataclass
+class DumpMergeConfig:
+    max_workers: int = None  # defaults to the number of cores
+    dedupe_column: str = 'TTNumber'
+    pattern: str = '*.xlsx'  # workbooks picked up from a directory
+
+class DumpSchemaMismatch(ValueError):
+    pass
+
+def dump_paths(source, pattern: str = '*.xlsx') -> list:
+    """The workbooks behind a raw data source: one path, a list of paths, or a directory of dumps."""
+    if isinstance(source, (list, tuple)):
+        return [str(path) for path in source]
+    if os.path.isdir(source):
+        # Excel keeps '~$' lock files beside open workbooks
+        return sorted(path for path in glob.glob(os.path.join(source, pattern))
+                      if not os.path.basename(path).startswith('~$'))
+    return [source]
+
+def _load_dump(path: str, cache_dir: str, schema=VNOC_DUMP_SCHEMA) -> pd.DataFrame:
+    """Process-pool worker: parses one workbook through the shared columnar cache."""
+    cache = DataCache(DataCacheConfig(cache_dir=cache_dir))
+    try:
+        return cache.load(path, schema.read, variant=schema.fingerprint())
+    except SchemaValidationError as e:
+        # Name the offending workbook among several
+        raise SchemaValidationError(e.missing_columns, source=path) from None
+
+def _concat(frames: list) -> pd.DataFrame:
+    # Each dump has its own categories; unite them so the merged columns stay categorical
+    columns = {}
+    for col in frames[0].columns:
+        parts = [frame[col] for frame in frames]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            columns[col] = pd.Series(union_categoricals(parts, ignore_order=True), name=col)
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+def check_schemas(paths: list, frames: list):
+    """Raises DumpSchemaMismatch unless every dump has the same columns with the same kinds of values."""
+    expected = frames[0]
+    for path, frame in zip(paths[1:], frames[1:]):
+        missing = [col for col in expected.columns if col not in frame.columns]
+        extra = [col for col in frame.columns if col not in expected.columns]
+        if missing or extra:
+            raise DumpSchemaMismatch(f"{path} does not match {paths[0]}: missing columns {missing}, "
+                                     f"extra columns {extra}")
+        differing = [col for col in expected.columns if frame[col].dtype.kind != expected[col].dtype.kind
+                     and not frame[col].isna().all() and not expected[col].isna().all()]
+        if differing:
+            raise DumpSchemaMismatch(f"{path} has different column types than {paths[0]}: {differing}")
+
+def dedupe(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Keeps one row per ticket: a cleared copy over an open one, otherwise the one from the later dump."""
+    if column not in df.columns:
+        logging.warning(f'No {column} column, overlapping tickets are not deduplicated')
+        return df
+    keys = df[column]
+    # Rows without a ticket number are never duplicates of each other
+    has_key = keys.notna().to_numpy()
+    cleared = df['ClearedDateTime'].notna().to_numpy() if 'ClearedDateTime' in df.columns else np.zeros(len(df), bool)
+    order = np.lexsort((np.arange(len(df)), cleared))
+    ranked = df.iloc[order]
+    duplicated = ranked[column].duplicated(keep='last').to_numpy() & has_key[order]
+    kept = np.sort(order[~duplicated])
+    return df.iloc[kept].reset_index(drop=True)
+
+def merge_dumps(paths: list, config: DumpMergeConfig = None, cache_dir: str = None, schema=VNOC_DUMP_SCHEMA):
+    """Parses the dumps in parallel, one process per workbook, and merges them into one typed frame."""
+    config = config or DumpMergeConfig()
+    cache_dir = cache_dir or DataCacheConfig().cache_dir
+    try:
+        if not paths:
+            raise FileNotFoundError("No raw data workbooks to merge")
+        missing = [path for path in paths if not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(f"Raw data files not found: {missing}")
+
+        with span('read_raw.parallel', files=len(paths)) as record:
+            workers = min(config.max_workers or os.cpu_count() or 1, len(paths))
+            if workers > 1:
+                with process_pool(workers) as executor:
+                    frames = list(executor.map(_load_dump, paths, [cache_dir] * len(paths),
+                                               [schema] * len(paths)))
+            else:
+                frames = [_load_dump(path, cache_dir, schema) for path in paths]
+            record.rows_in = sum(len(frame) for frame in frames)
+
+            check_schemas(paths, frames)
+            merged = dedupe(_concat(frames), config.dedupe_column)
+            record.rows_out = len(merged)
+
+        logging.info(f'Merged {len(paths)} dumps: {record.rows_in} rows, {len(merged)} after removing '
+                     f'duplicate {config.dedupe_column}s')
+        return merged
+
+    except (SchemaValidationError, DumpSchemaMismatch):
+        # Validation errors reach the caller unchanged, as from a single dump
+        raise
+    except Exception as e:
+        logging.error('Exception occurred while merging raw data dumps', exc_info=True)
+        raise CustomException(e, sys)
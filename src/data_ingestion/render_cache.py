@@ -0,0 +1,93 @@
+import hashlib
+import os
+import threading
+import pandas as pd
+from dataclasses import dataclass
+from src.logger import logging
+from src.data_ingestion.data_cache import evict_lru
+
+@dataclass
+class RenderCacheConfig:
+    cache_dir: str = os.path.join('artifacts', 'render_cache')
+    max_cache_bytes: int = 512 * 1024 * 1024
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """Hashes a frame's cells and column labels (not its index), as a rendered table shows them."""
+    digest = hashlib.sha256(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+class RenderCache:
+    """Rendered images on disk, keyed on the frame's contents and every render parameter.
+
+    The directory is bounded by total bytes; hits refresh an entry's mtime, so the least
+    recently used images are evicted first. Hit and miss counters are kept per process.
+    """
+    SUFFIX = '.img'
+
+    def __init__(self, config: RenderCacheConfig = None):
+        self.config = config or RenderCacheConfig()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(df: pd.DataFrame, **params) -> str:
+        # Parameters are compared by repr, so dicts are sorted and dataclass styles spell out every field
+        params = {name: sorted(value.items()) if isinstance(value, dict) else value for name, value in params.items()}
+        return hashlib.sha256(f"{frame_hash(df)}|{sorted(params.items())!r}".encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.config.cache_dir, key + self.SUFFIX)
+
+    def get(self, key: str) -> bytes:
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            data = None
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        try:
+            os.makedirs(self.config.cache_dir, exist_ok=True)
+            path = self._entry_path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            evict_lru(self.config.cache_dir, self.config.max_cache_bytes, self.SUFFIX)
+        except OSError:
+            # Caching is an optimisation only; a failed write must not fail the render
+            logging.warning(f'Could not write render cache entry {key[:12]}', exc_info=True)
+
+    def get_or_render(self, key: str, render) -> bytes:
+        """Returns the cached image for key, calling render() for its bytes and caching them on a miss."""
+        data = self.get(key)
+        if data is not None:
+            logging.info(f'Render cache hit {key[:12]}')
+            return data
+        data = render()
+        self.put(key, data)
+        return data
+
+    def clear(self):
+        if os.path.isdir(self.config.cache_dir):
+            evict_lru(self.config.cache_dir, 0, self.SUFFIX)
+
+    def stats(self) -> dict:
+        entries = []
+        if os.path.isdir(self.config.cache_dir):
+            entries = [entry.stat().st_size for entry in os.scandir(self.config.cache_dir)
+                       if entry.name.endswith(self.SUFFIX)]
+        lookups = self.hits + self.misses
+        return {'entries': len(entries), 'bytes': sum(entries), 'max_bytes': self.config.max_cache_bytes,
+                'hits': self.hits, 'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None}
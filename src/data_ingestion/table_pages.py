@@ -0,0 +1,147 @@
+import gc
+import io
+import math
+import os
+import re
+import zipfile
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, replace
+from src.logger import logging
+from src.data_ingestion.table_renderer import (AXES_WIDTH_FRACTION, TIGHT_PAD_INCHES, TableStyle, cell_text,
+                                               column_widths, get_renderer, row_height_inches)
+
+@dataclass
+class PaginationConfig:
+    rows_per_page: int = 50
+    group_by: str = 'ClusterIncharge'  # None pages the frame straight through
+    max_dpi: int = 600
+    min_dpi: int = 72
+    max_page_bytes: int = 64 * 1024 * 1024  # cap on one page's raster buffer
+    bytes_per_pixel: int = 4  # RGBA, as matplotlib's Agg canvas allocates
+
+@dataclass
+class TablePage:
+    name: str
+    group: str
+    frame: pd.DataFrame
+    dpi: int
+    image: io.BytesIO = None
+
+def _slug(value) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(value)).strip('_') or 'page'
+
+def page_size_inches(col_inches: np.ndarray, rows: int, style: TableStyle) -> tuple:
+    """Width and height of a rendered page of rows (plus header), including the same padding as a tight bbox."""
+    width = float(col_inches.sum()) + 2 * TIGHT_PAD_INCHES
+    height = (rows + 1) * row_height_inches(style) + 2 * TIGHT_PAD_INCHES
+    return width, height
+
+def fit_dpi(width_in: float, height_in: float, config: PaginationConfig) -> int:
+    """Highest DPI, up to max_dpi, at which the page's raster buffer stays within max_page_bytes."""
+    max_pixels = config.max_page_bytes / config.bytes_per_pixel
+    dpi = int(math.sqrt(max_pixels / (width_in * height_in)))
+    return max(min(dpi, config.max_dpi), config.min_dpi)
+
+def max_rows_per_page(col_inches: np.ndarray, style: TableStyle, config: PaginationConfig) -> int:
+    """Rows that still fit under the memory cap when rendered at min_dpi."""
+    max_pixels = config.max_page_bytes / config.bytes_per_pixel
+    width_in = float(col_inches.sum()) + 2 * TIGHT_PAD_INCHES
+    max_height_in = max_pixels / (config.min_dpi ** 2) / width_in
+    rows = int((max_height_in - 2 * TIGHT_PAD_INCHES) / row_height_inches(style)) - 1
+    return max(rows, 1)
+
+class TablePaginator:
+    def __init__(self, df: pd.DataFrame, width_factors: dict = None, style: TableStyle = TableStyle(),
+                 config: PaginationConfig = PaginationConfig(), row_colors=None):
+        self.df = df
+        self.style = style
+        self.config = config
+        self.row_colors = None if row_colors is None else np.asarray(row_colors, dtype=object)
+        # Size columns from the whole frame so every page lines up the same way
+        self.text = cell_text(df)
+        widths = column_widths(self.text, df.columns, width_factors, style)
+        self.col_inches = widths * style.figsize[0] * AXES_WIDTH_FRACTION
+        self.rows_per_page = min(config.rows_per_page, max_rows_per_page(self.col_inches, style, config))
+        if self.rows_per_page < config.rows_per_page:
+            logging.info(f'Reduced rows per page to {self.rows_per_page} to respect the per-page memory cap')
+
+    def _groups(self):
+        if self.config.group_by and self.config.group_by in self.df.columns:
+            keys = self.df[self.config.group_by].to_numpy()
+            # Positions per group in first-appearance order, so the frame's sort order is kept
+            codes, uniques = pd.factorize(keys)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            for idx, group in enumerate(uniques):
+                yield str(group), order[bounds[idx]:bounds[idx + 1]]
+        else:
+            yield 'all', np.arange(len(self.df))
+
+    def plan(self):
+        """Yields the pages (frame slices and DPI) without rendering anything."""
+        page_no = 0
+        for group, positions in self._groups():
+            parts = range(0, len(positions), self.rows_per_page)
+            for part_no, start in enumerate(parts, 1):
+                rows = positions[start:start + self.rows_per_page]
+                width_in, height_in = page_size_inches(self.col_inches, len(rows), self.style)
+                page_no += 1
+                suffix = f"_{part_no}" if len(parts) > 1 else ''
+                yield TablePage(name=f"{page_no:03d}_{_slug(group)}{suffix}", group=group,
+                                frame=self.df.iloc[rows], dpi=fit_dpi(width_in, height_in, self.config)), rows
+
+    def _page_layout(self, rows: int):
+        # Size the figure exactly around the page, so it renders once at its final pixel size
+        figsize = page_size_inches(self.col_inches, rows, self.style)
+        style = replace(self.style, figsize=figsize)
+        return self.col_inches / figsize[0], style
+
+    def _page_colors(self, rows: np.ndarray):
+        return None if self.row_colors is None else self.row_colors[rows]
+
+    def iter_pages(self, backend: str = 'matplotlib'):
+        """Renders and yields one page at a time; only the current page's image is held in memory."""
+        renderer = get_renderer(backend)
+        for page, rows in self.plan():
+            # Figures and their canvases reference each other; free the previous page's raster
+            # buffer now rather than whenever the cyclic collector next runs
+            gc.collect()
+            widths, style = self._page_layout(len(rows))
+            page.image = renderer.render(self.text[rows], self.df.columns, widths, page.dpi, style, fit=True,
+                                         row_colors=self._page_colors(rows))
+            logging.info(f'Rendered page {page.name} ({len(rows)} rows at {page.dpi} dpi)')
+            yield page
+
+    def write_pngs(self, directory: str, backend: str = 'matplotlib') -> list:
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for page in self.iter_pages(backend):
+            path = os.path.join(directory, f"{page.name}.png")
+            with open(path, 'wb') as f:
+                f.write(page.image.getbuffer())
+            paths.append(path)
+        return paths
+
+    def write_zip(self, target, backend: str = 'matplotlib'):
+        """Writes every page as a PNG into a zip at target (a path or a binary file object)."""
+        with zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for page in self.iter_pages(backend):
+                archive.writestr(f"{page.name}.png", page.image.getvalue())
+        return target
+
+    def write_pdf(self, target):
+        """Writes one vector PDF page per table page to target (a path or a binary file object)."""
+        from matplotlib.backends.backend_pdf import PdfPages
+
+        renderer = get_renderer('matplotlib')
+        with PdfPages(target) as pdf:
+            for page, rows in self.plan():
+                widths, style = self._page_layout(len(rows))
+                fig = renderer.figure(self.text[rows], self.df.columns, widths, style, fit=True,
+                                      row_colors=self._page_colors(rows))
+                pdf.savefig(fig)
+                del fig
+                gc.collect()
+                logging.info(f'Wrote PDF page {page.name} ({len(rows)} rows)')
+        return target
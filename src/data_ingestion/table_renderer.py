@@ -0,0 +1,161 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+# Renders never need a GUI; choosing Agg before matplotlib loads skips its backend discovery
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+# matplotlib's default subplot box, used to turn axes-fraction widths into inches
+AXES_WIDTH_FRACTION = 0.775
+TIGHT_PAD_INCHES = 0.1
+
+@dataclass(frozen=True)
+class TableStyle:
+    figsize: tuple = (25, 15)
+    fontsize: float = 10
+    row_scale: float = 2
+    header_color: str = 'yellow'
+    text_color: str = 'black'
+    edge_color: str = 'black'
+    cell_color: str = 'white'
+    width_unit: float = 0.004  # axes-width fraction per character
+    default_width_factor: float = 1.5
+
+def row_height_inches(style: TableStyle = TableStyle()) -> float:
+    # matplotlib sizes table rows from the font (1.2 line spacing), then scale() stretches them
+    return style.fontsize / 72 * 1.2 * style.row_scale
+
+def cell_text(df: pd.DataFrame) -> np.ndarray:
+    """Converts every cell to its display string once, as a 2-D array."""
+    return df.to_numpy(dtype=object).astype(str)
+
+def column_widths(text: np.ndarray, columns, width_factors: dict = None, style: TableStyle = TableStyle()) -> np.ndarray:
+    """Returns each column's width as a fraction of the axes width, from its longest cell."""
+    width_factors = width_factors or {}
+    factors = np.array([width_factors.get(col, style.default_width_factor) for col in columns], dtype=float)
+    max_lengths = np.char.str_len(text).max(axis=0) if text.size else np.zeros(len(columns))
+    return max_lengths * factors * style.width_unit
+
+def preload():
+    """Imports what a matplotlib render needs, building the font cache on a fresh install."""
+    # Imported for their side effects only: loading font_manager builds the font cache
+    from matplotlib import font_manager  # noqa: F401
+    from matplotlib.backends import backend_agg  # noqa: F401
+    from matplotlib.figure import Figure  # noqa: F401
+
+class MatplotlibTableRenderer:
+    def figure(self, text: np.ndarray, columns, widths: np.ndarray, style: TableStyle = TableStyle(),
+               fit: bool = False, row_colors=None):
+        """Builds the table figure; with fit=True the axes fill a figure already sized to the table.
+        row_colors, when given, holds one background colour per body row (None keeps cell_color)."""
+        # The object-oriented API keeps renders independent of pyplot's global figure state
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=style.figsize)
+        ax = fig.add_axes((0, 0, 1, 1)) if fit else fig.add_subplot()
+        ax.xaxis.set_visible(False)
+        ax.yaxis.set_visible(False)
+        ax.set_frame_on(False)
+
+        tbl = ax.table(cellText=text, colLabels=list(columns), cellLoc='center', loc='center')
+        tbl.auto_set_font_size(False)
+        tbl.set_fontsize(style.fontsize)
+        tbl.scale(1, style.row_scale)
+
+        # One pass over the cells: width by column index, header styled by row index
+        for (row, col), cell in tbl.get_celld().items():
+            cell.set_width(widths[col])
+            cell.set_edgecolor(style.edge_color)
+            if row == 0:
+                cell.set_text_props(weight='bold', color=style.text_color)
+                cell.set_facecolor(style.header_color)
+            elif row_colors is not None and row_colors[row - 1] is not None:
+                cell.set_facecolor(row_colors[row - 1])
+
+        return fig
+
+    def render(self, text: np.ndarray, columns, widths: np.ndarray, dpi: int, style: TableStyle = TableStyle(),
+               fit: bool = False, row_colors=None) -> io.BytesIO:
+        fig = self.figure(text, columns, widths, style, fit, row_colors)
+        buf = io.BytesIO()
+        # A fitted figure needs no tight-bbox pass, which would draw the whole figure twice
+        fig.savefig(buf, format='png', bbox_inches=None if fit else 'tight', dpi=dpi)
+        buf.seek(0)
+        return buf
+
+class PillowTableRenderer:
+    """Rasterises the table directly, reproducing the matplotlib layout without building an artist tree."""
+
+    @staticmethod
+    def _font(size_px: int, bold: bool):
+        from PIL import ImageFont
+
+        name = 'DejaVuSans-Bold.ttf' if bold else 'DejaVuSans.ttf'
+        try:
+            return ImageFont.truetype(name, size_px)
+        except OSError:
+            pass
+        try:
+            import matplotlib
+            return ImageFont.truetype(os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf', name), size_px)
+        except (ImportError, OSError):
+            return ImageFont.load_default(size=size_px)
+
+    def render(self, text: np.ndarray, columns, widths: np.ndarray, dpi: int, style: TableStyle = TableStyle(),
+               fit: bool = False, row_colors=None) -> io.BytesIO:
+        from PIL import Image, ImageDraw
+
+        axes_width_px = style.figsize[0] * (1 if fit else AXES_WIDTH_FRACTION) * dpi
+        col_px = np.maximum(np.rint(widths * axes_width_px).astype(int), 1)
+        row_px = max(int(round(row_height_inches(style) * dpi)), 1)
+        pad = int(round(TIGHT_PAD_INCHES * dpi))
+        line = max(int(round(dpi / 72)), 1)
+
+        x_edges = pad + np.concatenate(([0], np.cumsum(col_px)))
+        n_rows = text.shape[0] + 1
+        y_edges = pad + row_px * np.arange(n_rows + 1)
+
+        image = Image.new('RGB', (int(x_edges[-1]) + pad, int(y_edges[-1]) + pad), style.cell_color)
+        draw = ImageDraw.Draw(image)
+        draw.rectangle([x_edges[0], y_edges[0], x_edges[-1], y_edges[1]], fill=style.header_color)
+        if row_colors is not None:
+            for row, color in enumerate(row_colors, 1):
+                if color is not None:
+                    draw.rectangle([x_edges[0], y_edges[row], x_edges[-1], y_edges[row + 1]], fill=color)
+
+        # Grid lines per row and column boundary instead of an outlined rectangle per cell
+        for y in y_edges:
+            draw.line([(x_edges[0], y), (x_edges[-1], y)], fill=style.edge_color, width=line)
+        for x in x_edges:
+            draw.line([(x, y_edges[0]), (x, y_edges[-1])], fill=style.edge_color, width=line)
+
+        font_px = max(int(round(style.fontsize / 72 * dpi)), 1)
+        font = self._font(font_px, bold=False)
+        header_font = self._font(font_px, bold=True)
+        x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+        y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+
+        for col, label in enumerate(columns):
+            draw.text((x_centers[col], y_centers[0]), str(label), fill=style.text_color, font=header_font, anchor='mm')
+        for row in range(text.shape[0]):
+            y = y_centers[row + 1]
+            for col in range(text.shape[1]):
+                draw.text((x_centers[col], y), text[row, col], fill=style.text_color, font=font, anchor='mm')
+
+        buf = io.BytesIO()
+        image.save(buf, format='PNG', dpi=(dpi, dpi))
+        buf.seek(0)
+        return buf
+
+RENDERERS = {
+    'matplotlib': MatplotlibTableRenderer(),
+    'pillow': PillowTableRenderer(),
+}
+
+def get_renderer(backend: str):
+    try:
+        return RENDERERS[backend]
+    except KeyError:
+        raise ValueError(f"Unsupported render backend {backend!r}, expected one of {sorted(RENDERERS)}")
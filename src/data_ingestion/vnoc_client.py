@@ -0,0 +1,172 @@
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from http.cookiejar import LWPCookieJar
+from urllib.parse import urljoin
+from src.exception import CustomException
+from src.logger import logging, setup_logging
+
+def _env(name: str, default: str = None):
+    return field(default_factory=lambda: os.environ.get(name, default))
+
+@dataclass
+class VnocClientConfig:
+    """Connection settings for the VNOC portal; credentials and endpoints come from the environment."""
+    base_url: str = _env('VNOC_BASE_URL', 'https://vnoc.atctower.in/vnoc/')
+    username: str = _env('VNOC_USERNAME')
+    password: str = _env('VNOC_PASSWORD')
+    login_path: str = 'Default.aspx'
+    # The TroubleTicketLogDetail grid's export request, as captured from the browser's network tab
+    export_path: str = _env('VNOC_EXPORT_PATH')
+    export_method: str = _env('VNOC_EXPORT_METHOD', 'GET')
+    export_params: str = _env('VNOC_EXPORT_PARAMS', '{}')  # JSON object sent as query string or form body
+    cookie_path: str = os.path.join('artifacts', 'vnoc_cookies.txt')
+    raw_data_path: str = os.path.join('artifacts', 'Raw_data.xlsx')
+    connect_timeout: float = 10
+    read_timeout: float = 120
+    chunk_size: int = 1024 * 1024
+
+class VnocLoginError(RuntimeError):
+    pass
+
+class _FormInputs(HTMLParser):
+    # Collects the hidden ASP.NET fields (__VIEWSTATE, __EVENTVALIDATION, ...) the login post must echo back
+    def __init__(self):
+        super().__init__()
+        self.fields = {}
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'input' and attrs.get('type', '').lower() == 'hidden' and attrs.get('name'):
+            self.fields[attrs['name']] = attrs.get('value') or ''
+
+class VnocClient:
+    """Logs in to the VNOC portal once and downloads the trouble ticket export over plain HTTP.
+
+    The session's cookies are kept in cookie_path, so later runs skip the login until the
+    portal expires them; an expired session is detected and logged in again once.
+    """
+    USERNAME_FIELD = 'appLogin$UserName'
+    PASSWORD_FIELD = 'appLogin$Password'
+    LOGIN_BUTTON = 'appLogin$LoginImageButton'
+    XLSX_MAGIC = b'PK'
+
+    def __init__(self, config: VnocClientConfig = None):
+        # Imported here so the rest of the ingestion does not need requests installed
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.config = config or VnocClientConfig()
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.cookies = LWPCookieJar(self.config.cookie_path)
+        if os.path.exists(self.config.cookie_path):
+            try:
+                self.session.cookies.load(ignore_discard=True)
+                logging.info('Reusing saved VNOC session cookies')
+            except Exception:
+                logging.warning(f'Ignoring unreadable cookie file {self.config.cookie_path}', exc_info=True)
+
+    @property
+    def _timeout(self) -> tuple:
+        return (self.config.connect_timeout, self.config.read_timeout)
+
+    def _url(self, path: str) -> str:
+        return urljoin(self.config.base_url, path)
+
+    def _is_login_page(self, response) -> bool:
+        # An expired session is answered with (or redirected to) the login form
+        return self.USERNAME_FIELD in response.text
+
+    def _save_cookies(self):
+        os.makedirs(os.path.dirname(self.config.cookie_path) or '.', exist_ok=True)
+        self.session.cookies.save(ignore_discard=True)
+        os.chmod(self.config.cookie_path, 0o600)
+
+    def login(self):
+        if not self.config.username or not self.config.password:
+            raise VnocLoginError("VNOC credentials are not configured; set VNOC_USERNAME and VNOC_PASSWORD")
+
+        logging.info('Logging in to VNOC')
+        login_url = self._url(self.config.login_path)
+        page = self.session.get(login_url, timeout=self._timeout)
+        page.raise_for_status()
+
+        form = _FormInputs()
+        form.feed(page.text)
+        data = dict(form.fields)
+        # An image button posts the click coordinates instead of its value
+        data.update({self.USERNAME_FIELD: self.config.username, self.PASSWORD_FIELD: self.config.password,
+                     f'{self.LOGIN_BUTTON}.x': '0', f'{self.LOGIN_BUTTON}.y': '0'})
+
+        response = self.session.post(login_url, data=data, timeout=self._timeout)
+        response.raise_for_status()
+        if self._is_login_page(response):
+            raise VnocLoginError("VNOC rejected the login; check VNOC_USERNAME and VNOC_PASSWORD")
+
+        self._save_cookies()
+        logging.info('Logged in to VNOC')
+
+    def _request_export(self):
+        if not self.config.export_path:
+            raise ValueError("VNOC export endpoint is not configured; set VNOC_EXPORT_PATH")
+        params = json.loads(self.config.export_params or '{}')
+        method = self.config.export_method.upper()
+        return self.session.request(method, self._url(self.config.export_path), stream=True,
+                                    timeout=self._timeout, allow_redirects=True,
+                                    **({'params': params} if method == 'GET' else {'data': params}))
+
+    def fetch(self, target: str = None) -> str:
+        """Streams the export to target (raw_data_path by default) and returns the path."""
+        target = target or self.config.raw_data_path
+        try:
+            if not self.session.cookies:
+                self.login()
+
+            response = self._request_export()
+            first_chunk = next(response.iter_content(self.config.chunk_size), b'')
+            if not first_chunk.startswith(self.XLSX_MAGIC):
+                # Anything but a workbook means the saved session expired; log in again once
+                response.close()
+                self.login()
+                response = self._request_export()
+                first_chunk = next(response.iter_content(self.config.chunk_size), b'')
+                if not first_chunk.startswith(self.XLSX_MAGIC):
+                    raise ValueError(f"VNOC export did not return a workbook "
+                                     f"(HTTP {response.status_code}, {response.headers.get('Content-Type')})")
+
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            size = len(first_chunk)
+            with response, open(tmp_path, 'wb') as f:
+                f.write(first_chunk)
+                for chunk in response.iter_content(self.config.chunk_size):
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, target)
+            self._save_cookies()
+
+            logging.info(f'VNOC export of {size} bytes saved to {target}')
+            return target
+
+        except Exception as e:
+            logging.error('Exception occurred while fetching the VNOC export', exc_info=True)
+            raise CustomException(e, sys)
+
+    def fetch_frame(self, ingestion=None):
+        """Fetches the export to the ingestion's raw_data_path and returns it parsed through the data cache."""
+        from src.data_ingestion.data_cleaning import DataIngestion
+
+        ingestion = ingestion or DataIngestion()
+        self.fetch(ingestion.ingestion_config.raw_data_path)
+        return ingestion.load_raw_data()
+
+    def close(self):
+        self.session.close()
+
+if __name__ == '__main__':
+    setup_logging()
+    print(VnocClient().fetch())
@@ -0,0 +1,233 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import date, datetime, timedelta
+from src.logger import logging, setup_logging
+from src.processes import process_pool
+from src.data_ingestion.data_cleaning import DataIngestion, DataIngestionConfig
+from src.data_ingestion.data_export import get_writer
+from src.data_pipeline.batch_report import slug
+from src.data_pipeline.pipeline_daemon import ReportJob, load_jobs
+
+RENDER_FORMATS = ('png', 'zip', 'pdf')
+DATA_FORMATS = ('xlsx', 'csv', 'parquet')
+
+@dataclass
+class BatchCliConfig:
+    output_dir: str = os.path.join('artifacts', 'batch')
+    formats: tuple = ('png',)
+    workers: int = None  # processes; defaults to the number of cores
+    report_date: date = None  # the day of OpenTime to report; today when None
+    dpi: int = 600
+    backend: str = 'matplotlib'
+    force: bool = False
+
+@dataclass
+class BatchJobRecord:
+    job: str
+    status: str = 'pending'  # 'written', 'empty', 'up to date' or 'failed'
+    rows: int = None
+    outputs: list = field(default_factory=list)
+    stages: dict = field(default_factory=dict)  # stage -> seconds
+    total_seconds: float = None
+    error: str = None
+
+def _source(job: ReportJob, inputs: list):
+    # --input replaces the jobs' own sources; the CLI never logs in to VNOC itself
+    if inputs:
+        return inputs if len(inputs) > 1 else inputs[0]
+    if job.source in ('vnoc', 'browser'):
+        raise ValueError(f"Job {job.name} fetches from {job.source}; pass the dumps with --input instead")
+    return job.source
+
+def _output_paths(job: ReportJob, config: BatchCliConfig) -> list:
+    stem = os.path.join(config.output_dir, slug(job.name))
+    return [f"{stem}.{fmt}" for fmt in config.formats]
+
+def _stamp_path(job: ReportJob, config: BatchCliConfig) -> str:
+    return os.path.join(config.output_dir, '.stamps', f"{slug(job.name)}.json")
+
+def input_key(job: ReportJob, raw_data_hash: str, config: BatchCliConfig) -> str:
+    """Everything a job's outputs depend on; unchanged keys mean the outputs are up to date."""
+    inputs = [raw_data_hash, job.signature(), sorted(config.formats), str(config.report_date), config.dpi,
+              config.backend]
+    return hashlib.sha256(json.dumps(inputs, default=str).encode()).hexdigest()
+
+def is_up_to_date(job: ReportJob, key: str, config: BatchCliConfig) -> bool:
+    stamp_path = _stamp_path(job, config)
+    if config.force or not os.path.exists(stamp_path):
+        return False
+    with open(stamp_path) as f:
+        stamp = json.load(f)
+    return stamp.get('key') == key and all(os.path.exists(path) for path in stamp.get('outputs', []))
+
+def _timed(record: BatchJobRecord, stage: str, fn, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        record.stages[stage] = round(time.perf_counter() - start, 3)
+
+def _write_atomic(path: str, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+def _write_bytes(path: str, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def _run_job(job: ReportJob, source, key: str, config: BatchCliConfig) -> BatchJobRecord:
+    """Process-pool worker: ingests, renders and writes one job's outputs, then stamps them."""
+    from src.data_ingestion.data_preprocessing import PlotChart
+
+    started = time.perf_counter()
+    record = BatchJobRecord(job=job.name)
+    try:
+        ingestion = DataIngestion(DataIngestionConfig(raw_data_path=source))
+        start = datetime.combine(config.report_date or date.today(), datetime.min.time())
+        result = _timed(record, 'ingest', ingestion.ingest, job.operators, job.alarms, job.clusters,
+                        start=start, end=start + timedelta(days=1))
+
+        outputs = _output_paths(job, config)
+        os.makedirs(config.output_dir, exist_ok=True)
+        if result is None:
+            record.status, record.rows = 'empty', 0
+            # Outputs of an earlier run would describe alarms the dump no longer reports
+            for path in outputs:
+                if os.path.exists(path):
+                    os.remove(path)
+            outputs = []
+        else:
+            record.rows = len(result.frame)
+            plot_chart = PlotChart(result.frame)
+            for fmt, path in zip(config.formats, outputs):
+                if fmt in DATA_FORMATS:
+                    _timed(record, f'export.{fmt}', _write_atomic, path,
+                           lambda tmp, fmt=fmt: get_writer(fmt).write(result.frame, tmp))
+                elif fmt == 'png':
+                    buf = _timed(record, 'render.png', plot_chart.create_table_image, dpi=config.dpi,
+                                 backend=config.backend)
+                    _write_atomic(path, lambda tmp: _write_bytes(tmp, buf.getbuffer()))
+                else:
+                    _timed(record, f'render.{fmt}', _write_atomic, path,
+                           lambda tmp, fmt=fmt: plot_chart.create_paginated_images(output=fmt, target=tmp,
+                                                                                   backend=config.backend))
+            record.status = 'written'
+        record.outputs = outputs
+
+        stamp_path = _stamp_path(job, config)
+        os.makedirs(os.path.dirname(stamp_path), exist_ok=True)
+        with open(stamp_path, 'w') as f:
+            json.dump({'key': key, 'outputs': outputs, 'written_at': datetime.now().isoformat(timespec='seconds')}, f)
+
+    except Exception as e:
+        record.status = 'failed'
+        record.error = str(e)
+        logging.error(f'Batch job {job.name} failed', exc_info=True)
+
+    record.total_seconds = round(time.perf_counter() - started, 3)
+    logging.info(f'Batch job {job.name}: {record.status} in {record.total_seconds}s {record.stages}')
+    return record
+
+def run_batch(jobs: list, inputs: list = None, config: BatchCliConfig = None) -> dict:
+    """Runs every job that is not up to date, concurrently, and returns the summary."""
+    config = config or BatchCliConfig()
+    if config.report_date is None:
+        # Pinned once, so the up-to-date check and every job agree on the day
+        config.report_date = date.today()
+    started = time.perf_counter()
+    records = {job.name: BatchJobRecord(job=job.name) for job in jobs}
+    pending = []
+
+    # Each distinct dump is hashed, and parsed into the columnar cache, once before the workers start
+    hashes, warmed = {}, set()
+    for job in jobs:
+        try:
+            source = _source(job, inputs)
+            source_id = json.dumps(source)
+            ingestion = DataIngestion(DataIngestionConfig(raw_data_path=source))
+            if source_id not in hashes:
+                if not ingestion.raw_data_exists():
+                    raise FileNotFoundError(f"Raw data not found at {source}")
+                hashes[source_id] = ingestion.raw_data_hash()
+            key = input_key(job, hashes[source_id], config)
+            if is_up_to_date(job, key, config):
+                records[job.name].status = 'up to date'
+                logging.info(f'Batch job {job.name}: outputs are up to date, skipping')
+                continue
+            if source_id not in warmed:
+                ingestion.load_raw_data()
+                warmed.add(source_id)
+            pending.append((job, source, key))
+        except Exception as e:
+            records[job.name].status = 'failed'
+            records[job.name].error = str(e)
+            logging.error(f'Batch job {job.name} could not start', exc_info=True)
+
+    if pending:
+        with process_pool(config.workers) as executor:
+            futures = {job.name: executor.submit(_run_job, job, source, key, config) for job, source, key in pending}
+            for name, future in futures.items():
+                try:
+                    records[name] = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. out of memory)
+                    records[name].status = 'failed'
+                    records[name].error = str(e)
+
+    counts = {}
+    for record in records.values():
+        counts[record.status] = counts.get(record.status, 0) + 1
+    return {'started_at': datetime.now().isoformat(timespec='seconds'),
+            'total_seconds': round(time.perf_counter() - started, 3), 'workers': config.workers or os.cpu_count(),
+            'counts': counts, 'jobs': [asdict(record) for record in records.values()]}
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Render alarm reports for a file of jobs without the web app')
+    parser.add_argument('jobs', help='JSON or YAML file of report jobs (name, operators, alarms, clusters, source)')
+    parser.add_argument('--input', nargs='+', default=None,
+                        help='dump workbooks or directories used by every job instead of its source')
+    parser.add_argument('--formats', default='png', help=f"comma-separated, from {', '.join(RENDER_FORMATS + DATA_FORMATS)}")
+    parser.add_argument('--workers', type=int, default=None, help='concurrent jobs (default: number of cores)')
+    parser.add_argument('--output-dir', default=BatchCliConfig.output_dir)
+    parser.add_argument('--date', type=date.fromisoformat, default=None, help='report day, YYYY-MM-DD (default: today)')
+    parser.add_argument('--dpi', type=int, default=BatchCliConfig.dpi)
+    parser.add_argument('--backend', default=BatchCliConfig.backend, choices=['matplotlib', 'pillow'])
+    parser.add_argument('--force', action='store_true', help='rebuild outputs that are up to date')
+    parser.add_argument('--summary', default=None, help='also write the JSON summary to this file')
+    args = parser.parse_args(argv)
+
+    formats = tuple(fmt.strip() for fmt in args.formats.split(',') if fmt.strip())
+    unknown = [fmt for fmt in formats if fmt not in RENDER_FORMATS + DATA_FORMATS]
+    if unknown:
+        parser.error(f"unknown formats {unknown}")
+
+    setup_logging()
+    config = BatchCliConfig(output_dir=args.output_dir, formats=formats, workers=args.workers,
+                            report_date=args.date, dpi=args.dpi, backend=args.backend, force=args.force)
+    try:
+        jobs = load_jobs(args.jobs)
+    except Exception as e:
+        # A missing or malformed jobs file still yields a summary for the caller to parse
+        logging.error(f'Could not load jobs from {args.jobs}', exc_info=True)
+        summary = {'started_at': datetime.now().isoformat(timespec='seconds'), 'total_seconds': 0.0,
+                   'workers': config.workers or os.cpu_count(), 'counts': {'failed': 1}, 'jobs': [],
+                   'error': f"Could not load jobs from {args.jobs}: {e}"}
+    else:
+        summary = run_batch(jobs, args.input, config)
+
+    # stdout carries only the summary, so cron wrappers can parse it
+    text = json.dumps(summary, indent=2)
+    print(text)
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            f.write(text)
+    return 1 if summary['counts'].get('failed') else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import as_completed
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from itertools import product
+from src.exception import CustomException
+from src.logger import logging, setup_logging
+from src.processes import process_pool
+from src.data_ingestion.data_cleaning import DataIngestion
+from src.data_ingestion.data_filter import FilterEngine
+
+@dataclass
+class BatchReportConfig:
+    output_dir: str = os.path.join('artifacts', 'reports')
+    manifest_name: str = 'manifest.json'
+    max_workers: int = None  # defaults to the number of cores
+    dpi: int = 600
+    backend: str = 'matplotlib'
+
+@dataclass
+class ReportEntry:
+    operator: str
+    alarm: str
+    cluster: str
+    rows: int = 0
+    image_path: str = None
+    status: str = 'empty'  # 'empty', 'rendered' or 'failed'
+    render_seconds: float = None
+    error: str = None
+
+def slug(value) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(value)).strip('_')
+
+def render_report(df, image_path: str, dpi: int, backend: str):
+    """Process-pool worker: renders one group's table and writes the PNG."""
+    # Imported here so only the workers pay for the plotting stack
+    from src.data_ingestion.data_preprocessing import PlotChart
+
+    start = time.perf_counter()
+    buf = PlotChart(df).create_table_image(dpi=dpi, backend=backend)
+    with open(image_path, 'wb') as f:
+        f.write(buf.getbuffer())
+    return time.perf_counter() - start
+
+class BatchReport:
+    GROUP_COLUMNS = ['SourceInput', 'EventName', 'Cluster']
+
+    def __init__(self, config: BatchReportConfig = None, ingestion: DataIngestion = None):
+        self.config = config or BatchReportConfig()
+        self.ingestion = ingestion or DataIngestion()
+
+    def partition(self, operators: list, alarms: list, clusters: list) -> dict:
+        """Loads and filters the dump once, then splits it into every (operator, alarm, cluster) group."""
+        df = self.ingestion.load_raw_data()
+        logging.info(f'Dataset read as pandas DataFrame with shape {df.shape}')
+
+        # The same filters as a single report, with every requested value at once
+        filter_result = FilterEngine(self.ingestion.filter_stages(operators, alarms, clusters)).run(df)
+        if filter_result.empty_stage is not None:
+            return {}
+
+        df = df[filter_result.mask]
+        # One groupby yields the row positions of every combination
+        groups = df.groupby(self.GROUP_COLUMNS, observed=True, sort=False).indices
+        logging.info(f'Partitioned {len(df)} rows into {len(groups)} operator/alarm/cluster groups')
+        return {key: self.ingestion.finalise(df.iloc[positions]) for key, positions in groups.items()}
+
+    def run(self, operators: list = None, alarms: list = None, clusters: list = None) -> dict:
+        """Renders one image per requested combination in parallel and writes a manifest of the outputs."""
+        operators = operators or self.ingestion.DEFAULT_OPERATORS
+        alarms = alarms or self.ingestion.DEFAULT_ALARMS
+        clusters = clusters or self.ingestion.DEFAULT_CLUSTERS
+        started = time.perf_counter()
+
+        try:
+            groups = self.partition(operators, alarms, clusters)
+            os.makedirs(self.config.output_dir, exist_ok=True)
+
+            entries = {}
+            with process_pool(self.config.max_workers) as executor:
+                futures = {}
+                for operator, alarm, cluster in product(operators, alarms, clusters):
+                    entry = ReportEntry(operator, alarm, cluster)
+                    entries[(operator, alarm, cluster)] = entry
+                    df = groups.get((operator, alarm, cluster))
+                    if df is None or df.empty:
+                        continue
+
+                    entry.rows = len(df)
+                    entry.image_path = os.path.join(
+                        self.config.output_dir, f"{slug(operator)}_{slug(alarm)}_{slug(cluster)}.png")
+                    future = executor.submit(render_report, df, entry.image_path, self.config.dpi, self.config.backend)
+                    futures[future] = entry
+
+                for future in as_completed(futures):
+                    entry = futures[future]
+                    try:
+                        entry.render_seconds = round(future.result(), 3)
+                        entry.status = 'rendered'
+                    except Exception as e:
+                        # One failed render must not lose the rest of the batch
+                        entry.status = 'failed'
+                        entry.error = str(e)
+                        logging.error(f'Rendering {entry.operator}/{entry.alarm}/{entry.cluster} failed: {e}')
+
+            manifest = {
+                'generated_at': datetime.now().isoformat(timespec='seconds'),
+                'raw_data_path': self.ingestion.ingestion_config.raw_data_path,
+                'total_seconds': round(time.perf_counter() - started, 3),
+                'reports': [asdict(entry) for entry in entries.values()],
+            }
+            manifest_path = os.path.join(self.config.output_dir, self.config.manifest_name)
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f, indent=2)
+            logging.info(f'Batch of {len(futures)} reports written, manifest at {manifest_path}')
+
+            return manifest
+
+        except Exception as e:
+            logging.error('Exception occurred during batch report generation', exc_info=True)
+            raise CustomException(e, sys)
+
+if __name__ == '__main__':
+    setup_logging()
+    manifest = BatchReport().run()
+    rendered = sum(entry['status'] == 'rendered' for entry in manifest['reports'])
+    print(f"Rendered {rendered} reports in {manifest['total_seconds']}s")
@@ -0,0 +1,119 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from src.logger import logging
+
+@dataclass
+class JobPoolConfig:
+    max_workers: int = 4
+    max_pending: int = 32  # queued plus running jobs; further submissions are refused
+    keep_finished: int = 16  # uncollected finished jobs kept so their owners can still collect the result
+    finished_ttl_seconds: float = 600  # uncollected results older than this are dropped
+
+class JobQueueFull(RuntimeError):
+    pass
+
+@dataclass
+class Job:
+    job_id: str
+    label: str
+    future: Future = None
+    progress: float = 0.0
+    message: str = 'Queued'
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float = None
+    finished_at: float = None
+
+    @property
+    def status(self) -> str:
+        if self.future is None or self.started_at is None:
+            return 'queued'
+        if not self.future.done():
+            return 'running'
+        return 'failed' if self.future.exception() is not None else 'done'
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def report(self, progress: float, message: str):
+        """Called by the running task to publish how far it got."""
+        self.progress = min(max(progress, 0.0), 1.0)
+        self.message = message
+
+    def result(self, timeout: float = None):
+        return self.future.result(timeout)
+
+class JobPool:
+    """A bounded pool of worker threads shared by every caller, with a capped queue of pending jobs."""
+
+    def __init__(self, config: JobPoolConfig = None):
+        self.config = config or JobPoolConfig()
+        self._executor = ThreadPoolExecutor(max_workers=self.config.max_workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _run(self, job: Job, fn, args, kwargs):
+        job.started_at = time.time()
+        job.report(0.0, 'Started')
+        try:
+            value = fn(job, *args, **kwargs)
+            job.report(1.0, 'Done')
+            return value
+        except Exception:
+            job.message = 'Failed'
+            logging.error(f'Job {job.label} ({job.job_id}) failed', exc_info=True)
+            raise
+        finally:
+            job.finished_at = time.time()
+            logging.info(f'Job {job.label} ({job.job_id}) finished in {job.finished_at - job.started_at:.2f}s '
+                         f'after {job.started_at - job.submitted_at:.2f}s queued')
+
+    def submit(self, label: str, fn, *args, **kwargs) -> Job:
+        """Queues fn(job, *args, **kwargs); fn reports progress through job.report()."""
+        with self._lock:
+            if self.pending() >= self.config.max_pending:
+                raise JobQueueFull(f"{self.config.max_pending} jobs are already pending")
+            self._forget_finished()
+            job = Job(job_id=uuid.uuid4().hex, label=label)
+            self._jobs[job.job_id] = job
+            job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _forget_finished(self):
+        # Results can hold whole reports; abandoned ones must not accumulate in server memory
+        expired = time.time() - self.config.finished_ttl_seconds
+        finished = [job_id for job_id, job in self._jobs.items() if job.done()]
+        stale = finished[:max(len(finished) - self.config.keep_finished, 0)]
+        stale += [job_id for job_id in finished if (self._jobs[job_id].finished_at or 0) < expired]
+        for job_id in set(stale):
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Job:
+        return self._jobs.get(job_id)
+
+    def collect(self, job_id: str):
+        """Returns a finished job's result (or raises its error) and forgets the job."""
+        with self._lock:
+            job = self._jobs.pop(job_id)
+        return job.result()
+
+    def pending(self) -> int:
+        return sum(not job.done() for job in list(self._jobs.values()))
+
+    def queue_position(self, job: Job) -> int:
+        """How many queued jobs were submitted before this one (0 once it is running)."""
+        if job.status != 'queued':
+            return 0
+        return sum(other.status == 'queued' and other.submitted_at < job.submitted_at
+                   for other in list(self._jobs.values()))
+
+    def stats(self) -> dict:
+        statuses = [job.status for job in list(self._jobs.values())]
+        return {'workers': self.config.max_workers, 'max_pending': self.config.max_pending,
+                'queued': statuses.count('queued'), 'running': statuses.count('running'),
+                'done': statuses.count('done'), 'failed': statuses.count('failed')}
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
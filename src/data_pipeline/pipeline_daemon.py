@@ -0,0 +1,391 @@
+import argparse
+import calendar
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, asdict
+from datetime import date, datetime, timedelta
+from src.exception import CustomException
+from src.logger import logging, setup_logging
+from src.processes import process_pool
+from src.data_ingestion.data_cache import evict_lru, file_hash
+from src.data_ingestion.data_cleaning import DataIngestion, DataIngestionConfig
+from src.data_pipeline.batch_report import render_report, slug
+
+@dataclass
+class PipelineConfig:
+    jobs_path: str = 'pipeline_jobs.json'
+    work_dir: str = os.path.join('artifacts', 'pipeline')
+    ledger_name: str = 'ledger.jsonl'
+    publish_dir: str = os.path.join('artifacts', 'published')
+    max_upload_bytes: int = 1024 * 1024 * 1024  # stored dumps beyond this are evicted, least recently used first
+    sla_seconds: float = 15 * 60
+    max_runs: int = 4  # runs in flight at once, each at a different stage
+    fetch_workers: int = 1
+    ingest_workers: int = 2
+    render_workers: int = None  # processes; defaults to the number of cores
+    publish_workers: int = 1
+    dpi: int = 600
+    backend: str = 'matplotlib'
+
+@dataclass
+class ReportJob:
+    name: str
+    operators: list = None
+    alarms: list = None
+    clusters: list = None
+    source: str = 'vnoc'  # 'vnoc' (HTTP export), 'browser' (Selenium export) or a path to a dump
+    interval_minutes: float = None
+    cron: str = None  # 'minute hour day month weekday', e.g. '*/15 6-22 * * *'
+    paginate: bool = False  # publish a zip of per-ClusterIncharge pages instead of one image
+
+    def signature(self) -> str:
+        # Inputs besides the dump that change the report
+        return json.dumps([self.operators, self.alarms, self.clusters, self.paginate], sort_keys=True)
+
+def _render_pages(df, zip_path: str, dpi: int, backend: str):
+    """Process-pool worker: renders the table as memory-capped pages into a zip."""
+    from src.data_ingestion.data_preprocessing import PlotChart
+
+    start = time.perf_counter()
+    with open(zip_path, 'wb') as f:
+        PlotChart(df).create_paginated_images(output='zip', target=f, backend=backend)
+    return time.perf_counter() - start
+
+def load_jobs(path: str) -> list:
+    """Reads report jobs from a JSON or YAML file holding a list (or a {'jobs': [...]} mapping)."""
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    if isinstance(spec, dict):
+        spec = spec.get('jobs', [])
+    jobs = [ReportJob(**entry) for entry in spec]
+    names = [job.name for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Job names must be unique: {names}")
+    return jobs
+
+def _cron_field(text: str, low: int, high: int) -> set:
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step = part.split('/')
+            step = int(step)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-'))
+        else:
+            start = end = int(part)
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronSchedule:
+    """A five-field cron expression; day of week runs 0-6 from Sunday.
+
+    As in cron, when both day of month and day of week are restricted a day matching either fires.
+    """
+    SEARCH_YEARS = 9  # the longest gap between leap days, e.g. a schedule on 29 February
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {expression!r}")
+        self.minutes = sorted(_cron_field(fields[0], 0, 59))
+        self.hours = sorted(_cron_field(fields[1], 0, 23))
+        self.days = _cron_field(fields[2], 1, 31)
+        self.months = _cron_field(fields[3], 1, 12)
+        self.weekdays = {day % 7 for day in _cron_field(fields[4], 0, 7)}
+        self.either_day = not fields[2].startswith('*') and not fields[4].startswith('*')
+
+    def day_matches(self, day: date) -> bool:
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        return (in_days or in_weekdays) if self.either_day else (in_days and in_weekdays)
+
+    def next_after(self, moment: datetime) -> datetime:
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        year, month = start.year, start.month
+        # Jump over months, then days, that cannot fire; only the first day needs a time after start
+        for _ in range(self.SEARCH_YEARS * 12):
+            if month in self.months:
+                first_day = start.day if (year, month) == (start.year, start.month) else 1
+                for day in range(first_day, calendar.monthrange(year, month)[1] + 1):
+                    if not self.day_matches(date(year, month, day)):
+                        continue
+                    for hour in self.hours:
+                        for minute in self.minutes:
+                            candidate = datetime(year, month, day, hour, minute, tzinfo=start.tzinfo)
+                            if candidate >= start:
+                                return candidate
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        raise ValueError("Cron expression never fires")
+
+def next_run(job: ReportJob, after: datetime) -> datetime:
+    if job.cron:
+        return CronSchedule(job.cron).next_after(after)
+    if job.interval_minutes:
+        return after + timedelta(minutes=job.interval_minutes)
+    raise ValueError(f"Job {job.name} needs an interval_minutes or a cron schedule")
+
+@dataclass
+class RunRecord:
+    run_id: str
+    job: str
+    started_at: str
+    status: str = 'running'  # 'published', 'empty', 'skipped' or 'failed'
+    content_hash: str = None
+    rows: int = None
+    stages: dict = field(default_factory=dict)  # stage name -> seconds
+    total_seconds: float = None
+    sla_met: bool = None
+    output_path: str = None
+    error: str = None
+
+class PipelineRunner:
+    """Runs report jobs as fetch -> ingest -> render -> publish, each stage on its own bounded pool.
+
+    Runs move through the stages independently, so one run's fetch can overlap another's render.
+    A job whose dump and filters are unchanged since its last published run is skipped after the fetch.
+    """
+    STAGES = ('fetch', 'ingest', 'render', 'publish')
+
+    def __init__(self, config: PipelineConfig = None):
+        self.config = config or PipelineConfig()
+        self._pools = {
+            'fetch': ThreadPoolExecutor(self.config.fetch_workers, thread_name_prefix='fetch'),
+            'ingest': ThreadPoolExecutor(self.config.ingest_workers, thread_name_prefix='ingest'),
+            'render': process_pool(self.config.render_workers),
+            'publish': ThreadPoolExecutor(self.config.publish_workers, thread_name_prefix='publish'),
+        }
+        self._runs = ThreadPoolExecutor(self.config.max_runs, thread_name_prefix='run')
+        self._ledger_lock = threading.Lock()
+        self._fetchers = {}
+        self.ledger_path = os.path.join(self.config.work_dir, self.config.ledger_name)
+        self.last_published = self._load_last_published()
+
+    def _load_last_published(self) -> dict:
+        # Job name -> input key of its last published run, so restarts still skip unchanged inputs
+        last = {}
+        for record in read_ledger(self.ledger_path):
+            if record['status'] in ('published', 'empty'):
+                last[record['job']] = record['content_hash']
+        return last
+
+    def _append_ledger(self, record: RunRecord):
+        with self._ledger_lock:
+            os.makedirs(os.path.dirname(self.ledger_path), exist_ok=True)
+            with open(self.ledger_path, 'a') as f:
+                f.write(json.dumps(asdict(record)) + '\n')
+
+    def _stage(self, record: RunRecord, name: str, fn, *args):
+        start = time.perf_counter()
+        try:
+            return self._pools[name].submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A render worker died (e.g. out of memory); later runs need a working pool
+            self._pools[name] = process_pool(self.config.render_workers)
+            raise
+        finally:
+            record.stages[name] = round(time.perf_counter() - start, 3)
+
+    def _fetch(self, job: ReportJob) -> str:
+        """Gets the dump and stores it by content hash; returns that hash."""
+        if job.source in ('vnoc', 'browser'):
+            if job.source not in self._fetchers:
+                if job.source == 'vnoc':
+                    from src.data_ingestion.vnoc_client import VnocClient
+                    self._fetchers[job.source] = VnocClient()
+                else:
+                    from src.data_ingestion.data_injecting import VnocBrowserFetcher
+                    self._fetchers[job.source] = VnocBrowserFetcher()
+            download_path = os.path.join(self.config.work_dir, 'downloads', f"{slug(job.name)}.xlsx")
+            source_path = self._fetchers[job.source].fetch(download_path)
+        else:
+            source_path = job.source
+
+        content_hash = file_hash(source_path)
+        raw_data_path = DataIngestionConfig.for_upload(content_hash, slug(job.name)).raw_data_path
+        if not os.path.exists(raw_data_path):
+            os.makedirs(os.path.dirname(raw_data_path), exist_ok=True)
+            shutil.copyfile(source_path, f"{raw_data_path}.tmp")
+            os.replace(f"{raw_data_path}.tmp", raw_data_path)
+            evict_lru(os.path.dirname(raw_data_path), self.config.max_upload_bytes, suffix='.xlsx',
+                      keep=(raw_data_path,))
+        else:
+            os.utime(raw_data_path)
+        return content_hash
+
+    def _ingest(self, job: ReportJob, content_hash: str, report_day: date):
+        ingestion = DataIngestion(DataIngestionConfig.for_upload(content_hash, slug(job.name)))
+        start = datetime.combine(report_day, datetime.min.time())
+        return ingestion.ingest(job.operators, job.alarms, job.clusters, persist=True, background=False,
+                                start=start, end=start + timedelta(days=1))
+
+    def _published_paths(self, job: ReportJob) -> list:
+        stem = os.path.join(self.config.publish_dir, slug(job.name))
+        return [f"{stem}.png", f"{stem}.zip"]
+
+    def _unpublish(self, job: ReportJob):
+        # With no alarms left, an earlier report would keep showing alarms that have cleared
+        for path in self._published_paths(job):
+            if os.path.exists(path):
+                os.remove(path)
+                logging.info(f'Removed stale published report {path}')
+
+    def _publish(self, job: ReportJob, image_path: str) -> str:
+        os.makedirs(self.config.publish_dir, exist_ok=True)
+        target = os.path.join(self.config.publish_dir, slug(job.name) + os.path.splitext(image_path)[1])
+        # Readers of the published report never see a partial file
+        shutil.copyfile(image_path, f"{target}.tmp")
+        os.replace(f"{target}.tmp", target)
+        # After a paginate switch the report in the other format would keep showing old alarms
+        for path in self._published_paths(job):
+            if path != target and os.path.exists(path):
+                os.remove(path)
+                logging.info(f'Removed stale published report {path}')
+        return target
+
+    def run_job(self, job: ReportJob) -> RunRecord:
+        started = time.perf_counter()
+        record = RunRecord(run_id=uuid.uuid4().hex[:12], job=job.name,
+                           started_at=datetime.now().isoformat(timespec='seconds'))
+        try:
+            # The report covers one day's alarms; pinned here so the skip key and the ingestion agree
+            report_day = date.today()
+            dump_hash = self._stage(record, 'fetch', self._fetch, job)
+            inputs = f"{job.signature()}:{report_day.isoformat()}"
+            record.content_hash = f"{dump_hash}:{hashlib.sha256(inputs.encode()).hexdigest()[:16]}"
+
+            if self.last_published.get(job.name) == record.content_hash:
+                record.status = 'skipped'
+                logging.info(f'Pipeline job {job.name}: inputs unchanged, skipping')
+            else:
+                result = self._stage(record, 'ingest', self._ingest, job, dump_hash, report_day)
+                if result is None:
+                    self._unpublish(job)
+                    record.status = 'empty'
+                    record.rows = 0
+                else:
+                    record.rows = len(result.frame)
+                    render = _render_pages if job.paginate else render_report
+                    image_path = os.path.join(self.config.work_dir, 'renders',
+                                              record.run_id + ('.zip' if job.paginate else '.png'))
+                    os.makedirs(os.path.dirname(image_path), exist_ok=True)
+                    self._stage(record, 'render', render, result.frame, image_path,
+                                self.config.dpi, self.config.backend)
+                    record.output_path = self._stage(record, 'publish', self._publish, job, image_path)
+                    os.remove(image_path)
+                    record.status = 'published'
+                self.last_published[job.name] = record.content_hash
+
+        except Exception as e:
+            record.status = 'failed'
+            record.error = str(e)
+            logging.error(f'Pipeline job {job.name} failed', exc_info=True)
+
+        record.total_seconds = round(time.perf_counter() - started, 3)
+        record.sla_met = record.total_seconds <= self.config.sla_seconds
+        if not record.sla_met:
+            logging.warning(f'Pipeline job {job.name} took {record.total_seconds}s, '
+                            f'over the {self.config.sla_seconds}s SLA')
+        logging.info(f'Pipeline run {record.run_id} of {job.name}: {record.status} {record.stages}')
+        self._append_ledger(record)
+        return record
+
+    def run_once(self, jobs: list) -> list:
+        """Runs every job once, overlapping their stages, and returns the run records."""
+        futures = [self._runs.submit(self.run_job, job) for job in jobs]
+        return [future.result() for future in futures]
+
+    def serve(self, jobs: list, stop: threading.Event = None):
+        """Schedules jobs until stop is set; a job is not started again while its previous run is in flight."""
+        stop = stop or threading.Event()
+        now = datetime.now()
+        due = {job.name: now for job in jobs}
+        in_flight = {}
+        logging.info(f'Pipeline daemon started with {len(jobs)} jobs')
+
+        while not stop.is_set():
+            now = datetime.now()
+            for job in jobs:
+                running = in_flight.get(job.name)
+                if now >= due[job.name] and (running is None or running.done()):
+                    in_flight[job.name] = self._runs.submit(self.run_job, job)
+                    due[job.name] = next_run(job, now)
+            wait = (min(due.values()) - datetime.now()).total_seconds()
+            stop.wait(min(max(wait, 1), 60))
+
+    def close(self):
+        self._runs.shutdown(wait=True)
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+        for fetcher in self._fetchers.values():
+            fetcher.close()
+
+def read_ledger(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def sla_summary(records: list, sla_seconds: float = 15 * 60) -> dict:
+    """Per-job run counts, stage timings and SLA breaches from ledger records."""
+    summary = {}
+    for record in records:
+        job = summary.setdefault(record['job'], {'runs': 0, 'failed': 0, 'skipped': 0, 'sla_breaches': 0,
+                                                 'max_seconds': 0.0, 'stage_max_seconds': {}})
+        job['runs'] += 1
+        job['failed'] += record['status'] == 'failed'
+        job['skipped'] += record['status'] == 'skipped'
+        job['sla_breaches'] += record['total_seconds'] > sla_seconds
+        job['max_seconds'] = max(job['max_seconds'], record['total_seconds'])
+        for stage, seconds in record['stages'].items():
+            job['stage_max_seconds'][stage] = max(job['stage_max_seconds'].get(stage, 0.0), seconds)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scheduled fetch -> ingest -> render -> publish pipeline')
+    parser.add_argument('--jobs', default=PipelineConfig.jobs_path, help='JSON or YAML file of report jobs')
+    parser.add_argument('--once', action='store_true', help='run every job once and exit')
+    parser.add_argument('--summary', action='store_true', help='print the ledger SLA summary and exit')
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    config = PipelineConfig(jobs_path=args.jobs)
+    if args.summary:
+        ledger = read_ledger(os.path.join(config.work_dir, config.ledger_name))
+        print(json.dumps(sla_summary(ledger, config.sla_seconds), indent=2))
+        return
+
+    try:
+        runner = PipelineRunner(config)
+        jobs = load_jobs(config.jobs_path)
+    except Exception as e:
+        logging.error('Could not start the pipeline', exc_info=True)
+        raise CustomException(e, sys)
+
+    try:
+        if args.once:
+            for record in runner.run_once(jobs):
+                print(f"{record.job}: {record.status} in {record.total_seconds}s {record.stages}")
+        else:
+            runner.serve(jobs)
+    except KeyboardInterrupt:
+        logging.info('Pipeline daemon stopped')
+    finally:
+        runner.close()
+
+if __name__ == '__main__':
+    main()
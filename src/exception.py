@@ -1,5 +1,5 @@
 import sys
-from src.logger import logging
+from src.logger import logging, setup_logging
 
 def error_message_detail(error, error_detail: sys):
     """
@@ -38,6 +38,7 @@ class CustomException(Exception):
 
 
 if __name__ == "__main__":
+    setup_logging()
     logging.info("Logging has started")
 
     try:
@@ -1,15 +1,284 @@
-import logging 
+import atexit
+import logging
+import logging.handlers
 import os
+import functools
+import json
+import queue
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
 from datetime import datetime
 
-LOG_FILE=f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
-logs_path=os.path.join(os.getcwd(),"logs",LOG_FILE)
-os.makedirs(logs_path,exist_ok=True)
+LOG_FORMAT = "[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s"
 
-LOG_FILE_PATH=os.path.join(logs_path,LOG_FILE)
+@dataclass
+class LoggingConfig:
+    log_dir: str = field(default_factory=lambda: os.environ.get('LOG_DIR', 'logs'))
+    file_name: str = 'alarm_log.log'
+    level: str = field(default_factory=lambda: os.environ.get('LOG_LEVEL', 'INFO'))
+    levels: dict = field(default_factory=dict)  # per-logger overrides, e.g. {'alarm_log.profile': 'WARNING'}
+    max_bytes: int = 10 * 1024 * 1024  # size-based rotation
+    rotate_when: str = None  # time-based rotation instead, e.g. 'midnight' or 'H'
+    backup_count: int = 10
+    console: bool = False
+    queue_size: int = 10000  # records waiting for the writer; beyond this callers wait for room
 
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO
-)
\ No newline at end of file
+_listener = None
+_log_path = None
+_config = None
+_setup_lock = threading.Lock()
+
+class _BlockingQueueHandler(logging.handlers.QueueHandler):
+    # The stock handler drops records with an error when the queue is full
+    def enqueue(self, record):
+        self.queue.put(record)
+
+def _file_handler(config: LoggingConfig, path: str) -> logging.Handler:
+    if config.rotate_when:
+        return logging.handlers.TimedRotatingFileHandler(path, when=config.rotate_when,
+                                                         backupCount=config.backup_count, encoding='utf-8')
+    return logging.handlers.RotatingFileHandler(path, maxBytes=config.max_bytes,
+                                                backupCount=config.backup_count, encoding='utf-8')
+
+def _log_straight_to(path: str):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    watched = logging.handlers.WatchedFileHandler(path, encoding='utf-8')
+    watched.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(watched)
+
+def _after_fork_in_child():
+    # A forked worker inherits the queue but not the writer thread; write straight to the shared file instead
+    if _listener is not None:
+        _log_straight_to(_log_path)
+
+def log_path() -> str:
+    """The file setup_logging writes to, or None before it has run."""
+    return _log_path if _listener is not None else None
+
+def setup_worker_logging(path: str, level: int):
+    """Process-pool initializer: a spawned worker writes its records to the parent's log file."""
+    _log_straight_to(path)
+    logging.getLogger().setLevel(level)
+
+def setup_logging(config: LoggingConfig = None) -> str:
+    """Routes all logging through a queue to a background writer with a rotating file in one directory.
+
+    Call once at application startup; later calls return the same log path and keep the first config.
+    """
+    # Streamlit sessions start on their own threads; only the first may install the listener
+    with _setup_lock:
+        if _listener is None:
+            _start_listener(config or LoggingConfig())
+        elif config is not None and config != _config:
+            logging.warning(f'Logging is already set up with {_config}; ignoring {config}')
+    return _log_path
+
+def _start_listener(config: LoggingConfig):
+    global _listener, _log_path, _config
+    _config = config
+    os.makedirs(config.log_dir, exist_ok=True)
+    _log_path = os.path.join(config.log_dir, config.file_name)
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [_file_handler(config, _log_path)]
+    if config.console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # Callers only enqueue the record; file I/O and rotation happen on the listener's thread
+    records = queue.Queue(config.queue_size)
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_BlockingQueueHandler(records))
+    root.setLevel(config.level.upper())
+    for name, level in config.levels.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    logging.info(f'Logging to {_log_path}')
+
+def shutdown_logging():
+    """Flushes queued records and stops the writer thread."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+# Registered once; both do nothing while no listener is running
+atexit.register(shutdown_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+# Span records go to their own logger so they can be levelled or routed apart from the messages
+profile_logger = logging.getLogger('alarm_log.profile')
+
+def log_frame(message: str, df, rows: int = 5, level: int = logging.DEBUG):
+    """Logs the head of a frame; the frame is only formatted when the level is enabled."""
+    if logging.getLogger().isEnabledFor(level):
+        logging.log(level, f"{message}\n{df.head(rows)}")
+
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:
+        # Windows has no resource module
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _rows(value):
+    shape = getattr(value, 'shape', None)
+    return int(shape[0]) if shape else None
+
+@dataclass
+class SpanRecord:
+    name: str
+    started_at: str = None
+    seconds: float = None
+    rows_in: int = None
+    rows_out: int = None
+    rss_mb: float = None  # resident memory when the span ended
+    peak_rss_mb: float = None  # process high-water mark when the span ended
+    peak_alloc_mb: float = None  # peak Python/NumPy allocations above the span's start; needs trace_memory()
+    thread: str = None
+    fields: dict = field(default_factory=dict)
+
+@dataclass
+class Profile:
+    """Spans recorded while a profile() block was active, in the order they finished."""
+    name: str
+    spans: list = field(default_factory=list)
+
+    def summary(self) -> dict:
+        stages = {}
+        for record in self.spans:
+            stage = stages.setdefault(record.name, {'calls': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+                                                  'rows_in': 0, 'rows_out': 0, 'peak_rss_mb': None,
+                                                  'peak_alloc_mb': None})
+            stage['calls'] += 1
+            stage['total_seconds'] = round(stage['total_seconds'] + record.seconds, 4)
+            stage['max_seconds'] = max(stage['max_seconds'], record.seconds)
+            stage['rows_in'] += record.rows_in or 0
+            stage['rows_out'] += record.rows_out or 0
+            for key in ('peak_rss_mb', 'peak_alloc_mb'):
+                value = getattr(record, key)
+                if value is not None:
+                    stage[key] = max(stage[key] or 0.0, value)
+        return {'profile': self.name, 'stages': stages}
+
+    def format_summary(self) -> str:
+        lines = [f"Profile {self.name}:", f"{'span':<32}{'calls':>6}{'seconds':>10}{'rows in':>10}{'rows out':>10}"
+                                                  f"{'peak RSS MB':>13}"]
+        for name, stage in self.summary()['stages'].items():
+            lines.append(f"{name:<32}{stage['calls']:>6}{stage['total_seconds']:>10.3f}{stage['rows_in']:>10}"
+                         f"{stage['rows_out']:>10}{str(stage['peak_rss_mb']):>13}")
+        return '\n'.join(lines)
+
+    def to_json(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({**self.summary(), 'spans': [asdict(record) for record in self.spans]}, f, indent=2)
+
+_current_profile = ContextVar('current_profile', default=None)
+_open_spans = threading.local()
+
+def trace_memory(enabled: bool = True):
+    """Turns on tracemalloc so spans also report their peak allocations; it slows Python-heavy code."""
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+@contextmanager
+def span(name: str, rows_in: int = None, **fields):
+    """Times a block and records it as a structured span; set record.rows_out inside the block.
+
+        with span('filter.clusters', rows_in=len(df)) as record:
+            df = df[mask]
+            record.rows_out = len(df)
+    """
+    record = SpanRecord(name=name, started_at=datetime.now().isoformat(timespec='milliseconds'),
+                        rows_in=rows_in, thread=threading.current_thread().name, fields=fields)
+    stack = _open_spans.__dict__.setdefault('stack', [])
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack and stack[-1] is not None:
+            # The enclosing span keeps the peak it reached before this one resets the counter
+            stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        stack.append({'start': current, 'peak': current})
+    else:
+        stack.append(None)
+
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = round(time.perf_counter() - start, 6)
+        frame = stack.pop()
+        if tracing and tracemalloc.is_tracing():
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            record.peak_alloc_mb = round((peak - frame['start']) / 1024 / 1024, 2)
+            if stack and stack[-1] is not None:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+        record.rss_mb = _rss_mb()
+        if record.rss_mb is not None:
+            record.rss_mb = round(record.rss_mb, 1)
+        record.peak_rss_mb = _peak_rss_mb()
+        if record.peak_rss_mb is not None:
+            record.peak_rss_mb = round(record.peak_rss_mb, 1)
+
+        profile_run = _current_profile.get()
+        if profile_run is not None:
+            profile_run.spans.append(record)
+        if profile_logger.isEnabledFor(logging.INFO):
+            profile_logger.info(json.dumps(asdict(record), default=str))
+
+def timed(name: str = None):
+    """Decorator form of span(); rows_in/rows_out come from the first frame argument and the returned frame."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rows_in = next((rows for rows in map(_rows, args) if rows is not None), None)
+            with span(span_name, rows_in=rows_in) as record:
+                result = func(*args, **kwargs)
+                record.rows_out = _rows(result)
+                return result
+        return wrapper
+    return decorator
+
+@contextmanager
+def profile(name: str, log_summary: bool = True):
+    """Collects every span finished in this context (this thread/task) into a Profile."""
+    profile_run = Profile(name)
+    token = _current_profile.set(profile_run)
+    try:
+        yield profile_run
+    finally:
+        _current_profile.reset(token)
+        if log_summary and profile_logger.isEnabledFor(logging.INFO):
+            profile_logger.info(profile_run.format_summary())
@@ -0,0 +1,17 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from src.logger import log_path, logging, setup_worker_logging
+
+def process_context():
+    # Forking a process that runs threads (the log writer, the job and stage pools) can copy a lock
+    # another thread holds into the child, which then hangs; workers start from a clean process instead
+    return multiprocessing.get_context('forkserver' if os.name == 'posix' else 'spawn')
+
+def process_pool(max_workers: int = None) -> ProcessPoolExecutor:
+    """A process pool whose workers start clean and, once logging is set up, log to the same file."""
+    path = log_path()
+    if path is None:
+        return ProcessPoolExecutor(max_workers, mp_context=process_context())
+    return ProcessPoolExecutor(max_workers, mp_context=process_context(), initializer=setup_worker_logging,
+                               initargs=(path, logging.getLogger().level))
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from src.data_ingestion.alarm_correlation import CorrelationConfig, IncidentCorrelator
+
+def _alarms(rows):
+    # (site, event, opened at minute, cleared at minute or None) from a fixed day
+    day = pd.Timestamp('2026-10-17')
+    return pd.DataFrame({
+        'SiteID': [site for site, _, _, _ in rows],
+        'EventName': pd.Categorical([event for _, event, _, _ in rows]),
+        'OpenTime': [day + pd.Timedelta(minutes=opened) for _, _, opened, _ in rows],
+        'ClearedDateTime': [day + pd.Timedelta(minutes=cleared) if cleared is not None else pd.NaT
+                            for _, _, _, cleared in rows],
+    })
+
+def test_overlapping_alarms_at_a_site_form_one_incident():
+    df = _alarms([
+        ('S1', '4G OUTAGE', 20, 50),
+        ('S1', 'Mains Fail/EB Fail', 0, 30),
+        ('S1', 'SITE ON BATTERY', 10, 25),
+    ])
+    result = IncidentCorrelator().run(df)
+    assert len(result.incidents) == 1
+    root = result.incidents.iloc[0]
+    # The earliest cascade stage is the root cause, whatever order the rows came in
+    assert root['EventName'] == 'Mains Fail/EB Fail'
+    assert root['ChildAlarms'] == 2
+    assert len(set(result.incident_ids)) == 1
+
+def test_alarms_after_the_incident_cleared_start_a_new_one():
+    df = _alarms([
+        ('S1', 'Mains Fail/EB Fail', 0, 30),
+        ('S1', '4G OUTAGE', 40, 50),
+    ])
+    result = IncidentCorrelator().run(df)
+    assert len(result.incidents) == 2
+    assert list(result.incidents['ChildAlarms']) == [0, 0]
+
+    # Within the gap, the later alarm still belongs to the first incident
+    joined = IncidentCorrelator(CorrelationConfig(gap_minutes=15)).run(df)
+    assert len(joined.incidents) == 1
+
+def test_open_alarms_keep_the_incident_open():
+    df = _alarms([
+        ('S1', 'Mains Fail/EB Fail', 0, None),
+        ('S1', 'DG on Load', 600, 700),
+    ])
+    assert len(IncidentCorrelator().run(df).incidents) == 1
+
+def test_sites_are_correlated_separately():
+    df = _alarms([
+        ('S1', 'Mains Fail/EB Fail', 0, 30),
+        ('S2', 'SITE ON BATTERY', 5, 30),
+        ('S2', '2G OUTAGE', 10, 20),
+    ])
+    result = IncidentCorrelator().run(df)
+    assert sorted(result.incidents['SiteID']) == ['S1', 'S2']
+    assert result.incident_ids[1] == result.incident_ids[2] != result.incident_ids[0]
+    s2 = result.incidents[result.incidents['SiteID'] == 'S2'].iloc[0]
+    assert s2['EventName'] == 'SITE ON BATTERY' and s2['ChildAlarms'] == 1
+
+def test_alarms_without_a_site_stand_alone():
+    df = _alarms([
+        (None, 'Mains Fail/EB Fail', 0, 30),
+        (None, 'DG on Load', 5, 30),
+    ])
+    result = IncidentCorrelator().run(df)
+    assert len(result.incidents) == 2
+    assert len(np.unique(result.incident_ids)) == 2
+
+def test_empty_frame():
+    result = IncidentCorrelator().run(_alarms([]))
+    assert result.incidents.empty and len(result.incident_ids) == 0
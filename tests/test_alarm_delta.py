@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from src.data_ingestion.alarm_delta import CLEARED, NEW, STILL_OPEN, DeltaConfig, DeltaTracker
+
+def _alarms(rows):
+    # (site, opened at hour, cleared) on a fixed day
+    day = pd.Timestamp('2026-10-17')
+    return pd.DataFrame({
+        'SiteID': [site for site, _, _ in rows],
+        'EventName': ['4G OUTAGE'] * len(rows),
+        'OpenTime': [day + pd.Timedelta(hours=hour) for _, hour, _ in rows],
+        'ClearedDateTime': [day + pd.Timedelta(hours=23) if cleared else pd.NaT for _, _, cleared in rows],
+    })
+
+def _status(result) -> dict:
+    return dict(zip(result.frame['SiteID'], result.frame[DeltaTracker.STATUS_COLUMN]))
+
+@pytest.fixture
+def tracker(tmp_path):
+    return DeltaTracker(DeltaConfig(snapshot_dir=str(tmp_path)))
+
+def test_first_run_reports_every_open_alarm_as_new(tracker):
+    result = tracker.diff(_alarms([('A', 1, False), ('B', 2, False), ('C', 3, True)]), 'key', save=False)
+    assert result.first_run
+    assert _status(result) == {'A': NEW, 'B': NEW}
+    assert result.counts == {NEW: 2, CLEARED: 0, STILL_OPEN: 0, 'gone': 0}
+
+def test_new_cleared_and_still_open_across_a_commit(tracker):
+    tracker.diff(_alarms([('A', 1, False), ('B', 2, False)]), 'key', save=False).commit()
+
+    result = tracker.diff(_alarms([('A', 1, False), ('B', 2, True), ('D', 4, False)]), 'key', save=False)
+    assert not result.first_run
+    assert _status(result) == {'B': CLEARED, 'D': NEW}
+    assert result.counts == {NEW: 1, CLEARED: 1, STILL_OPEN: 1, 'gone': 0}
+
+    with_open = tracker.diff(_alarms([('A', 1, False), ('B', 2, True), ('D', 4, False)]), 'key',
+                             include_open=True, save=False)
+    assert _status(with_open) == {'A': STILL_OPEN, 'B': CLEARED, 'D': NEW}
+
+def test_snapshot_only_advances_on_commit(tracker):
+    first = tracker.diff(_alarms([('A', 1, False)]), 'key', save=False)
+    again = tracker.diff(_alarms([('A', 1, False)]), 'key', save=False)
+    assert again.first_run and _status(again) == {'A': NEW}
+
+    first.commit()
+    after = tracker.diff(_alarms([('A', 1, False)]), 'key', save=False)
+    assert after.frame.empty and after.counts[STILL_OPEN] == 1
+
+def test_cleared_alarms_never_reported_are_not_news(tracker):
+    tracker.diff(_alarms([('A', 1, False)]), 'key', save=False).commit()
+    result = tracker.diff(_alarms([('A', 1, False), ('E', 5, True)]), 'key', save=False)
+    assert result.frame.empty
+
+def test_alarms_missing_from_the_dump_are_counted_as_gone(tracker):
+    tracker.diff(_alarms([('A', 1, False), ('B', 2, False)]), 'key', save=False).commit()
+    result = tracker.diff(_alarms([]), 'key', save=False)
+    assert result.frame.empty and result.counts['gone'] == 2
+    result.commit()
+    assert tracker.diff(_alarms([('A', 1, False)]), 'key', save=False).counts[NEW] == 1
+
+def test_snapshots_are_kept_per_key(tracker):
+    tracker.diff(_alarms([('A', 1, False)]), 'one').commit()
+    assert tracker.diff(_alarms([('A', 1, False)]), 'two', save=False).first_run
+
+def test_snapshot_key_ignores_value_order():
+    assert DeltaTracker.snapshot_key('dump', ['RJIO', 'Mobile'], ['4G OUTAGE']) == \
+        DeltaTracker.snapshot_key('dump', ['Mobile', 'RJIO'], ['4G OUTAGE'])
+    assert DeltaTracker.snapshot_key('dump', ['RJIO'], '2026-10-17') != \
+        DeltaTracker.snapshot_key('dump', ['RJIO'], '2026-10-18')
@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.data_ingestion.alarm_escalation import EscalationConfig, EscalationEngine
+
+NOW = datetime(2026, 10, 17, 12, 0)
+
+def _alarms(rows):
+    # (event, minutes open at NOW, cleared after minutes or None, engineer)
+    now = pd.Timestamp(NOW)
+    return pd.DataFrame({
+        'EventName': pd.Categorical([event for event, _, _, _ in rows]),
+        'OpenTime': [now - pd.Timedelta(minutes=age) for _, age, _, _ in rows],
+        'ClearedDateTime': [now - pd.Timedelta(minutes=age) + pd.Timedelta(minutes=cleared)
+                            if cleared is not None else pd.NaT for _, age, cleared, _ in rows],
+        'ClusterIncharge': ['Incharge'] * len(rows),
+        'ClusterEngineer': [engineer for _, _, _, engineer in rows],
+    })
+
+def test_levels_count_the_thresholds_reached():
+    # 4G OUTAGE escalates at 60, 120 and 240 minutes
+    ages = np.array([0, 59.9, 60, 119, 120, 240, 10000, np.nan])
+    names = pd.Series(['4G OUTAGE'] * len(ages))
+    assert list(EscalationEngine().levels(names, ages)) == [0, 0, 1, 1, 2, 3, 3, 0]
+
+def test_unlisted_events_use_the_default_ladder():
+    engine = EscalationEngine(EscalationConfig(ladders={'4G OUTAGE': (10,)}, default_ladder=(100, 200)))
+    names = pd.Series(['4G OUTAGE', 'Other', 'Other', None])
+    assert list(engine.levels(names, np.array([15, 150, 250, 1000]))) == [1, 1, 2, 0]
+
+    never = EscalationEngine(EscalationConfig(ladders={}, default_ladder=()))
+    assert list(never.levels(pd.Series(['Other']), np.array([1e9]))) == [0]
+
+def test_age_runs_to_clearing_or_now():
+    df = _alarms([('4G OUTAGE', 90, None, 'E1'), ('4G OUTAGE', 90, 30, 'E1')])
+    assert list(EscalationEngine.age_minutes(df, NOW)) == [90, 30]
+
+def test_queues_hold_open_escalated_alarms_most_urgent_first():
+    df = _alarms([
+        ('4G OUTAGE', 70, None, 'E1'),     # level 1
+        ('4G OUTAGE', 300, None, 'E1'),    # level 3
+        ('4G OUTAGE', 130, None, 'E1'),    # level 2
+        ('4G OUTAGE', 30, None, 'E1'),     # not escalated
+        ('4G OUTAGE', 500, 400, 'E1'),     # cleared, left out of the queues
+        ('2G OUTAGE', 65, None, 'E2'),     # level 1
+    ])
+    result = EscalationEngine().run(df, now=NOW)
+
+    assert list(result.frame['EscalationLevel']) == [1, 3, 2, 0, 3, 1]
+    assert list(result.queue('Incharge', 'E1')['AgeMinutes']) == [300, 130, 70]
+    assert len(result.queue('Incharge', 'E2')) == 1
+    assert result.queue('Incharge', 'nobody').empty
+
+    e1 = result.queues.loc[('Incharge', 'E1')]
+    assert e1['alarms'] == 3 and e1['oldest_minutes'] == 300
+    assert list(result.queues.index) == [('Incharge', 'E1'), ('Incharge', 'E2')]
+
+def test_cleared_alarms_can_be_queued():
+    df = _alarms([('4G OUTAGE', 500, 400, 'E1')])
+    result = EscalationEngine(EscalationConfig(open_only=False)).run(df, now=NOW)
+    assert len(result.queue('Incharge', 'E1')) == 1
@@ -0,0 +1,96 @@
+from datetime import date, datetime
+
+import pytest
+
+import src.data_pipeline.pipeline_daemon as pipeline_daemon
+from src.data_pipeline.pipeline_daemon import CronSchedule, PipelineConfig, PipelineRunner, ReportJob
+
+NOW = datetime(2026, 10, 17, 10, 0)  # a Saturday
+
+@pytest.mark.parametrize('expression, expected', [
+    ('*/15 6-22 * * *', datetime(2026, 10, 17, 10, 15)),
+    ('0 9 * * 1-5', datetime(2026, 10, 19, 9, 0)),
+    ('30 23 31 12 *', datetime(2026, 12, 31, 23, 30)),
+    ('0 0 * * 7', datetime(2026, 10, 18, 0, 0)),  # 7 is Sunday, as 0 is
+    ('0 9 29 2 *', datetime(2028, 2, 29, 9, 0)),
+])
+def test_cron_next_after(expression, expected):
+    assert CronSchedule(expression).next_after(NOW) == expected
+
+def test_cron_fires_on_either_restricted_day_field():
+    # The 1st of any month or any Monday: Monday the 19th comes first
+    assert CronSchedule('0 9 1 * 1').next_after(NOW) == datetime(2026, 10, 19, 9, 0)
+    assert CronSchedule('0 9 29 2 1').next_after(NOW) == datetime(2027, 2, 1, 9, 0)
+
+def test_cron_is_strictly_after_the_moment():
+    assert CronSchedule('0 10 * * *').next_after(NOW) == datetime(2026, 10, 18, 10, 0)
+    assert CronSchedule('* * * * *').next_after(datetime(2026, 12, 31, 23, 59, 30)) == datetime(2027, 1, 1, 0, 0)
+
+def test_cron_that_never_fires():
+    with pytest.raises(ValueError, match='never fires'):
+        CronSchedule('0 0 31 2 *').next_after(NOW)
+
+def test_cron_needs_five_fields():
+    with pytest.raises(ValueError):
+        CronSchedule('0 9 * *')
+
+def test_signature_covers_the_report_inputs():
+    job = ReportJob('job', operators=['RJIO'], alarms=['4G OUTAGE'], clusters=['Goa'])
+    assert job.signature() != ReportJob('job', operators=['RJIO'], alarms=['2G OUTAGE'], clusters=['Goa']).signature()
+    assert job.signature() != ReportJob('job', operators=['RJIO'], alarms=['4G OUTAGE'], clusters=['Goa'],
+                                        paginate=True).signature()
+    assert job.signature() == ReportJob('job', operators=['RJIO'], alarms=['4G OUTAGE'], clusters=['Goa'],
+                                        interval_minutes=5).signature()
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    runner = PipelineRunner(PipelineConfig(work_dir=str(tmp_path / 'pipeline'),
+                                           publish_dir=str(tmp_path / 'published')))
+    # No dump is fetched or filtered: every run finds the same dump and no alarms in it
+    runner._fetch = lambda job: 'dump-hash'
+    runner._ingest = lambda job, content_hash, report_day: None
+    yield runner
+    runner.close()
+
+def _on_day(monkeypatch, day: date):
+    class Today(date):
+        @classmethod
+        def today(cls):
+            return day
+    monkeypatch.setattr(pipeline_daemon, 'date', Today)
+
+def test_unchanged_inputs_are_skipped(runner, monkeypatch):
+    _on_day(monkeypatch, date(2026, 10, 17))
+    job = ReportJob('job', source='dump.xlsx')
+    assert runner.run_job(job).status == 'empty'
+    assert runner.run_job(job).status == 'skipped'
+
+def test_skip_key_changes_with_paginate_and_day(runner, monkeypatch):
+    _on_day(monkeypatch, date(2026, 10, 17))
+    job = ReportJob('job', source='dump.xlsx')
+    first = runner.run_job(job)
+    job.paginate = True
+    toggled = runner.run_job(job)
+    assert toggled.status == 'empty' and toggled.content_hash != first.content_hash
+
+    _on_day(monkeypatch, date(2026, 10, 18))
+    assert runner.run_job(job).status == 'empty'
+
+def test_skip_key_survives_a_restart(runner, monkeypatch):
+    _on_day(monkeypatch, date(2026, 10, 17))
+    job = ReportJob('job', source='dump.xlsx')
+    runner.run_job(job)
+    restarted = PipelineRunner(runner.config)
+    try:
+        restarted._fetch = runner._fetch
+        assert restarted.run_job(job).status == 'skipped'
+    finally:
+        restarted.close()
+
+def test_empty_run_removes_the_published_report(runner, monkeypatch, tmp_path):
+    _on_day(monkeypatch, date(2026, 10, 17))
+    published = tmp_path / 'published'
+    published.mkdir()
+    (published / 'job.png').write_bytes(b'stale')
+    assert runner.run_job(ReportJob('job', source='dump.xlsx')).status == 'empty'
+    assert not (published / 'job.png').exists()